@@ -1,9 +1,13 @@
+import random
+
 # Internal imports
 from src.utils.logger import get_logger
+from src.utils.profiling import instrument
 
 logger = get_logger(__name__)
 
 
+@instrument
 def part_1(rotations: list[int], position: int=50, dial_max: int=100) -> int:
     """
     Args:
@@ -23,6 +27,7 @@ def part_1(rotations: list[int], position: int=50, dial_max: int=100) -> int:
 
     return zeros
 
+@instrument
 def part_2(rotations: list[int], position: int=50, dial_max: int=100) -> int:
     """
     Args:
@@ -44,6 +49,25 @@ def part_2(rotations: list[int], position: int=50, dial_max: int=100) -> int:
 
     return zeros
 
+@instrument
+def parse(content: str) -> tuple[list[int]]:
+    """
+    Args:
+        content: content of the input file, a rotation like "L68" or "R48" per line
+
+    Returns: rotations as signed clicks, left turns being negative
+    """
+    # Convert rotations into a list of summable values i.e. replace R with + and L with - signs
+    rotations = [line.strip() for line in content.splitlines() if line.strip()]
+    return ([int(r[1:]) * (1 if r[0] == "R" else -1) for r in rotations],)
+
+def generate(size: int, seed: int = 0) -> str:
+    """
+    Synthetic input of `size` rotations, for benchmarks.
+    """
+    rng = random.Random(seed)
+    return "\n".join(f"{rng.choice('LR')}{rng.randint(1, 999)}" for _ in range(size))
+
 def main(fp_input: str, position: int = 50, dial_max: int=100) -> None:
     """
     
@@ -52,24 +76,20 @@ def main(fp_input: str, position: int = 50, dial_max: int=100) -> None:
         position: initial position of the dial when we start, by default 50
         dial_max: max clicks on the dial, by default 100 (0-99)
     """
-    logger.info(f"Your password is encrypted in: {fp_input}")
+    logger.info("Your password is encrypted in: %s", fp_input)
 
     # Read input file and load rotations info as a list
-    rotations = []
     with open(fp_input, "r", encoding="utf-8") as f:
-        rotations.extend([line.strip() for line in f if line.strip()])
-    
-    logger.debug(f"Rotations - {len(rotations)}")
+        rotations, = parse(f.read())
     
-    # Convert rotations into a list of summable values i.e. replace R with + and L with - signs
-    rotations = [int(r[1:]) * (1 if r[0] == "R" else -1) for r in rotations]
+    logger.debug("Rotations - %s", len(rotations))
 
     # Solve for each part
     zero_clicks = part_1(rotations, position, dial_max)
-    logger.info(f"Open the door for {fp_input} using (part 1): {zero_clicks}")
+    logger.info("Open the door for %s using (part 1): %s", fp_input, zero_clicks)
 
     zero_clicks = part_2(rotations, position, dial_max)
-    logger.info(f"Open the door for {fp_input} using (part 2): {zero_clicks}")
+    logger.info("Open the door for %s using (part 2): %s", fp_input, zero_clicks)
 
 
 if __name__ == "__main__":
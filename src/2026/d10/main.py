@@ -1,32 +1,61 @@
-import numpy as np
+import functools
 import itertools
+import random
+import re
 
+from array import array
 from dataclasses import dataclass
-from scipy.optimize import linprog
-from scipy.optimize import Bounds, LinearConstraint, milp
+from pathlib import Path
 
 # Internal imports
 from src.utils.logger import get_logger
+from src.utils.profiling import instrument
+from src.utils.cache import LRUFileCache
 
 logger = get_logger(__name__)
 
-@dataclass
-class Machine:
-    """ 
-    Represents a factory machine based on the schematic input 
+# Solutions are shared between runs (and input files) through this cache
+CACHE_PATH = Path(__file__).parent / ".cache" / "solutions.json"
+
+class MachineSolver:
+    """
+    Solving logic shared by the machine records. Subclasses provide `num_lights`, `lights`,
+    `button_masks` and `joltages`.
     """
 
-    # We need this because the leading zero bits are lost when converting to int
-    # So we need to know how many bits we started with
-    num_lights: int 
-    lights: int # E.g. ".##." -> 0b110 = 6
-    buttons: list[list[int]]
-    joltages: list[int]
+    __slots__ = ()
 
-    def __post_init__(self):
-        """ Create button masks from button indices """
-        # E.g. [3] [1,3] ... -> [0b1000, 0b1010, ...] = [8, 10, ...]
-        self.button_masks = [sum(1 << i for i in indices) for indices in self.buttons]
+    def signature(self, kind: str) -> str:
+        """
+        Cache key of the machine for one kind of solution, "lights" or "joltages".
+
+        Buttons are sorted and lights relabeled by their target value and by the sizes of the
+        buttons touching them. The signature fully describes the relabeled machine, hence equal
+        signatures always mean equal solutions. It is not canonical though: lights with the same
+        profile keep their order, so some permutations of a machine get another signature (and
+        are solved again).
+        """
+        if kind == "lights":
+            targets = [self.lights >> i & 1 for i in range(self.num_lights)]
+        elif kind == "joltages":
+            targets = list(self.joltages)
+        else:
+            raise ValueError(f"Unknown solution kind: {kind}")
+
+        # Profile of each light, its target and the sizes of the buttons toggling it
+        profiles = [
+            (targets[i], sorted(mask.bit_count() for mask in self.button_masks if mask >> i & 1))
+            for i in range(self.num_lights)
+        ]
+        order = sorted(range(self.num_lights), key=profiles.__getitem__)
+        relabel = {old: new for new, old in enumerate(order)}
+
+        # Rebuild the button masks with the new light labels, sorted to drop button order
+        masks = sorted(
+            sum(1 << relabel[i] for i in range(self.num_lights) if mask >> i & 1)
+            for mask in self.button_masks
+        )
+        return f"{kind}:{self.num_lights}:{[targets[i] for i in order]}:{masks}"
     
     def get_presses_lights(self) -> int:
         """
@@ -86,16 +115,21 @@ class Machine:
 
         # # Use linprog from scipy to solve this efficiently where target is our joltages
         # return int(linprog(c, A_eq=A, b_eq=b, integrality=True).fun)
-        num_buttons = len(self.buttons)
+
+        # numpy and scipy are only needed here, importing them lazily keeps part 1 and the
+        # parser free of their start-up cost
+        import numpy as np
+        from scipy.optimize import Bounds, LinearConstraint, milp
+
+        num_buttons = len(self.button_masks)
         
         # Build the Coefficient Matrix 'A' (num_lights rows x num_buttons cols)
         # Each row 'i' represents a light (equation).
         # Each col 'j' represents a button (variable).
         # A[i][j] = 1 means "Button j adds 1 to Light i".
-        A = np.zeros((self.num_lights, num_buttons))
-        for j, indices in enumerate(self.buttons):
-            for i in indices:
-                A[i, j] = 1
+        masks = np.array(self.button_masks, dtype=np.uint64)
+        lights = np.arange(self.num_lights, dtype=np.uint64)
+        A = ((masks[np.newaxis, :] >> lights[:, np.newaxis]) & 1).astype(float)
                 
         # Build the Target Vector 'b'
         # These are the RHS values for our equations: "Light i needs 5 jolts".
@@ -127,7 +161,7 @@ class Machine:
         res = milp(c=c, constraints=constraints, integrality=integrality, bounds=bounds)
         
         if not res.success:
-            logger.warning(f"MILP failed for joltages {self.joltages}: {res.message}")
+            logger.warning("MILP failed for joltages %s: %s", self.joltages, res.message)
             return 0
             
         # Result x is returned as floats, even with integer constraints.
@@ -147,7 +181,44 @@ class Machine:
     def __str__(self):
         return f"Lights: {bin(self.lights)[2:]}, " \
              + f"Buttons: [{', '.join([bin(b)[2:] for b in self.button_masks])}], " \
-             + f"Joltages: {self.joltages}"
+             + f"Joltages: {list(self.joltages)}"
+
+
+@dataclass
+class Machine(MachineSolver):
+    """ 
+    Represents a factory machine based on the schematic input 
+    """
+
+    # We need this because the leading zero bits are lost when converting to int
+    # So we need to know how many bits we started with
+    num_lights: int 
+    lights: int # E.g. ".##." -> 0b110 = 6
+    buttons: list[list[int]]
+    joltages: list[int]
+
+    def __post_init__(self):
+        """ Create button masks from button indices """
+        # E.g. [3] [1,3] ... -> [0b1000, 0b1010, ...] = [8, 10, ...]
+        self.button_masks = [sum(1 << i for i in indices) for indices in self.buttons]
+
+
+@dataclass(slots=True)
+class PackedMachine(MachineSolver):
+    """
+    Compact machine record, button masks and joltages are stored in typed arrays
+    (uint64 and int32) instead of nested lists of Python ints.
+    """
+
+    num_lights: int
+    lights: int
+    button_masks: array
+    joltages: array
+
+    @property
+    def buttons(self) -> list[list[int]]:
+        """ Light indices of each button, e.g. [0b1010] -> [[1, 3]] """
+        return [[i for i in range(self.num_lights) if mask >> i & 1] for mask in self.button_masks]
 
 def parse_schematic_input(data: list[str]) -> list[Machine]:
     machines = []
@@ -171,51 +242,156 @@ def parse_schematic_input(data: list[str]) -> list[Machine]:
 
     return machines
 
-def part_1(machines: list[Machine]) -> int:
+# [.##.] (3) (1,3) ... {3,5,4,7} -> lights, all the buttons at once and joltages
+_SCHEMATIC = re.compile(rb"\[([.#]*)\]((?:\s*\([\d,]*\))*)\s*\{([\d,]*)\}")
+# ".##." -> "0110", reversed and read as binary so index 0 is bit 0
+_LIGHT_BITS = bytes.maketrans(b".#", b"01")
+
+def parse_schematic_packed(content: bytes | str) -> list[PackedMachine]:
     """
+    Single pass parser of the raw schematic file into compact `PackedMachine` records.
+
+    Args:
+        content: whole content of the schematic file
+
+    Returns: list of machines, one per schematic line
     """
-    buttons_pressed = 0
-    
-    for i, machine in enumerate(machines):
-        # logger.debug(f"Machine {i}: {machine}")
-        presses = machine.get_presses_lights()
-        # logger.debug(f"Presses: {presses}")
-        buttons_pressed += presses
-        
-    return buttons_pressed
+    if isinstance(content, str):
+        content = content.encode()
+
+    machines = []
+    # Buttons repeat a lot between machines, so each distinct button is only converted once
+    button_masks = {}
+    for lights, buttons, joltages in _SCHEMATIC.findall(content):
+        masks = array("Q")
+        for button in buttons.split():
+            mask = button_masks.get(button)
+            if mask is None:
+                mask = button_masks[button] = sum(1 << int(i) for i in button[1:-1].split(b","))
+            masks.append(mask)
+
+        machines.append(PackedMachine(
+            len(lights),
+            int(lights.translate(_LIGHT_BITS)[::-1] or b"0", 2),
+            masks,
+            array("i", map(int, joltages.split(b","))),
+        ))
+
+    return machines
+
+def solve_cached(machine: MachineSolver, kind: str, cache: LRUFileCache | None = None) -> int:
+    """
+    Solve the machine for "lights" or "joltages", reusing the solution of an equivalent
+    machine from the cache when there is one.
+    """
+    solve = machine.get_presses_lights if kind == "lights" else machine.get_presses_joltages
+    if cache is None:
+        return solve()
+
+    key = machine.signature(kind)
+    presses = cache.get(key)
+    if presses is None:
+        presses = solve()
+        # A failed MILP is logged and counted as 0 presses, only 0 targets really take 0 presses
+        if presses or kind == "lights" or not any(machine.joltages):
+            cache.put(key, presses)
+    return presses
+
+@functools.cache
+def default_cache() -> LRUFileCache:
+    """ The on-disk solution cache at CACHE_PATH, loaded once per process """
+    return LRUFileCache(CACHE_PATH)
 
-def part_2(machines: list[Machine]) -> int:
+def solve_all(machines: list[MachineSolver], kind: str, cache: LRUFileCache | bool = True) -> int:
     """
+    Total presses of the machines for "lights" or "joltages".
+
+    Args:
+        cache: a solution cache, True for the on-disk one (saved when done) or False for none
     """
+    store = default_cache() if cache is True else cache or None
     buttons_pressed = 0
-    
+
     for i, machine in enumerate(machines):
         # logger.debug(f"Machine {i}: {machine}")
-        presses = machine.get_presses_joltages()
+        presses = solve_cached(machine, kind, store)
         # logger.debug(f"Presses: {presses}")
         buttons_pressed += presses
-        
+
+    if cache is True:
+        store.save()
     return buttons_pressed
 
-def main(fp_input: str) -> None:
+@instrument
+def part_1(machines: list[MachineSolver], cache: LRUFileCache | bool = True) -> int:
+    """
+    Fewest presses to light up every machine, see `solve_all` for the cache.
+    """
+    return solve_all(machines, "lights", cache)
+
+@instrument
+def part_2(machines: list[MachineSolver], cache: LRUFileCache | bool = True) -> int:
+    """
+    Fewest presses to reach the joltages of every machine, see `solve_all` for the cache.
+    """
+    return solve_all(machines, "joltages", cache)
+
+@instrument
+def parse(content: bytes | str) -> tuple[list[PackedMachine]]:
+    """
+    Both parts take the machines from the compact parser.
+    """
+    return (parse_schematic_packed(content),)
+
+def generate(size: int, seed: int = 0) -> str:
+    """
+    Synthetic input of `size` solvable machines, for benchmarks.
+    """
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(size):
+        nlights = rng.randint(4, 10)
+        buttons = [sorted(rng.sample(range(nlights), rng.randint(1, nlights))) for _ in range(rng.randint(3, 12))]
+        # Lights and joltages are reached by pressing random buttons, so both have a solution
+        lights = [0] * nlights
+        for button in rng.sample(buttons, rng.randint(1, len(buttons))):
+            for i in button:
+                lights[i] ^= 1
+        joltages = [0] * nlights
+        for button in buttons:
+            presses = rng.randint(0, 20)
+            for i in button:
+                joltages[i] += presses
+        lines.append(
+            "[" + "".join(".#"[light] for light in lights) + "] "
+            + " ".join("(" + ",".join(map(str, button)) + ")" for button in buttons)
+            + " {" + ",".join(map(str, joltages)) + "}"
+        )
+    return "\n".join(lines)
+
+def part_kwargs(size: int) -> dict[int, dict[str, bool]]:
+    """ Benchmarks measure the solver, not the on-disk cache of previous runs """
+    return {1: {"cache": False}, 2: {"cache": False}}
+
+def main(fp_input: str, use_cache: bool = True) -> None:
     """
     Args:
         fp_input: input file path containing the dials (line by line)
+        use_cache: reuse (and store) solutions of equivalent machines from the on-disk cache
     """
-    logger.info(f"Your password is encrypted in: {fp_input}")
+    logger.info("Your password is encrypted in: %s", fp_input)
     
     # Read input file content 
-    with open(fp_input, "r", encoding="utf-8") as f:
+    with open(fp_input, "rb") as f:
         content = f.read()
-    schema = [row for row in content.splitlines()]  
-    machines = parse_schematic_input(schema)
+    machines, = parse(content)
     # logger.debug(f"Machines - \n{machines}")
 
-    result = part_1(machines)
-    logger.info(f"Solved for {fp_input}, use (part 1): {result}")
+    result = part_1(machines, use_cache)
+    logger.info("Solved for %s, use (part 1): %s", fp_input, result)
 
-    result = part_2(machines)
-    logger.info(f"Solved for {fp_input}, use (part 2): {result}")
+    result = part_2(machines, use_cache)
+    logger.info("Solved for %s, use (part 2): %s", fp_input, result)
 
 
 if __name__ == "__main__":
@@ -1,65 +1,252 @@
-import networkx as nx
+import random
 
-from functools import cache
+from collections import deque
+from collections.abc import Iterable
+from functools import lru_cache
 
 # Internal imports
 from src.utils.logger import get_logger
+from src.utils.profiling import instrument
+from src.utils.graph import CSRGraph
 
 logger = get_logger(__name__)
 
 
-def parse_raw(data: str):
+def parse_raw(data: str) -> CSRGraph:
     """
-    Docstring for parse_raw
+    Parse the device network into a compact CSR graph, use `CSRGraph.to_networkx`
+    when networkx is actually needed.
     
     :param data: Raw data from the input file
     :type data: str
     """
     lines = [line.partition(": ") for line in data.splitlines()]
     # logger.debug(f"lines - {lines}")
-    network = nx.DiGraph({node: neighbors.split() for node, _, neighbors in lines})
+    network = CSRGraph.from_adjacency((node, neighbors.split()) for node, _, neighbors in lines)
     return network
 
-def part_1(network : nx.DiGraph) -> int:
+def topological_order(network: CSRGraph, source: str | None = None) -> tuple[list[int], list[list[int]]]:
     """
+    Ids of the nodes reachable from the source (all nodes without a source), in topological
+    order (Kahn's algorithm), along with the successor ids of every node.
+
+    Raises:
+        ValueError: if the source isn't in the network, or a cycle is reachable from it, paths
+            can't be counted then
+    """
+    if source is not None and source not in network:
+        raise ValueError(f"Node '{source}' is not in the network")
+    successors = network.adjacency()
+    if source is None:
+        reachable, stack = [True] * len(network), []
+    else:
+        start = network.ids[source]
+        reachable, stack = [False] * len(network), [start]
+        reachable[start] = True
+
+    # Collect the part of the network reachable from the source
+    while stack:
+        for neighbor in successors[stack.pop()]:
+            if not reachable[neighbor]:
+                reachable[neighbor] = True
+                stack.append(neighbor)
+
+    nodes = [node for node in range(len(network)) if reachable[node]]
+    indegree = [0] * len(network)
+    for node in nodes:
+        for neighbor in successors[node]:
+            indegree[neighbor] += 1
+
+    # Repeatedly take nodes without any remaining incoming edge
+    order = []
+    queue = deque(node for node in nodes if indegree[node] == 0)
+    while queue:
+        node = queue.popleft()
+        order.append(node)
+        for neighbor in successors[node]:
+            indegree[neighbor] -= 1
+            if indegree[neighbor] == 0:
+                queue.append(neighbor)
+
+    if len(order) != len(nodes):
+        stuck = sorted(network.names[node] for node in nodes if indegree[node] > 0)
+        where = "" if source is None else f" reachable from '{source}'"
+        raise ValueError(f"Network has a cycle{where}, paths can't be counted (unordered nodes: {stuck[:5]})")
+    return order, successors
+
+def count_paths(network: CSRGraph, source: str, target: str) -> int:
+    """
+    Count the paths from source to target in O(V + E), every node passes its number of
+    paths on to its neighbors in topological order. There are no paths from or to a node
+    missing from the network.
+    """
+    if source not in network:
+        return 0
+    order, successors = topological_order(network, source)
+    paths = [0] * len(network)
+    paths[network.ids[source]] = 1
+    for node in order:
+        for neighbor in successors[node]:
+            paths[neighbor] += paths[node]
+    return paths[network.ids[target]] if target in network else 0
+
+@instrument
+def part_1(network : CSRGraph) -> int:
+    """
+    Count the paths from "you" to "out".
     """
-    # logger.debug(f"All simple paths: \n{list(nx.all_simple_paths(network, "you", "out"))}")
-    return len(list(nx.all_simple_paths(network, "you", "out")))
+    return count_paths(network, "you", "out")
+
+def count_paths_via(network: CSRGraph, source: str, target: str, required: Iterable[str] = ()) -> int:
+    """
+    Count the paths from source to target that visit every one of the required nodes.
+
+    The DP runs iteratively over node ids in reverse topological order, where paths[v][mask]
+    is the number of paths from v to the target that visit exactly the required nodes in
+    `mask`. So there is no recursion depth limit and no string keys.
+    """
+    if source not in network:
+        return 0
+    order, successors = topological_order(network, source)
+    required = list(dict.fromkeys(required))
+    reachable = set(order)
+    if any(node not in network or network.ids[node] not in reachable for node in [target, *required]):
+        return 0
+
+    bits = [0] * len(network)
+    for k, node in enumerate(required):
+        bits[network.ids[node]] = 1 << k
+    nmasks = 1 << len(required)
+    end = network.ids[target]
+
+    paths: list[list[int]] = [[]] * len(network)
+    for v in reversed(order):
+        counts = [0] * nmasks
+        if v == end:
+            # Paths end at the target
+            counts[bits[v]] = 1
+        else:
+            for w in successors[v]:
+                if bits[v]:
+                    for mask, count in enumerate(paths[w]):
+                        counts[mask | bits[v]] += count
+                else:
+                    counts = [a + b for a, b in zip(counts, paths[w])]
+        paths[v] = counts
+
+    return paths[network.ids[source]][nmasks - 1]
 
-def part_2(graph: nx.DiGraph) -> int:
+@instrument
+def part_2(graph: CSRGraph, required: Iterable[str] = ("fft", "dac")) -> int:
     """ 
-    Count unique paths from start_node to "out" using recursion and memoization.
+    Count unique paths from "svr" to "out" that visit all the required nodes.
     """
+    return count_paths_via(graph, "svr", "out", required)
 
-    @cache
-    def _count(current: str, seen) -> int:
-        """ Inner function used because the graph itself is unhashable. """
-        if current == "out":
-            return seen == 2
-        seen += current in {"fft", "dac"}
-        return sum(_count(neighbor, seen) for neighbor in graph[current])
-    
-    return _count("svr", 0)
+class PathCounter:
+    """
+    Answers many path count queries on the same network.
+
+    The network is ordered topologically once. Forward vectors (paths from a source to every
+    node) and backward vectors (paths from every node to a target) are computed on demand from
+    that order and kept in LRU caches, so a query is a few lookups and multiplications:
+    paths(A -> X -> B) = paths(A -> X) * paths(X -> B).
+    """
+
+    def __init__(self, network: CSRGraph, maxsize: int = 128):
+        self.network = network
+        self._order, self._successors = topological_order(network)
+        self._position = [0] * len(network)
+        for position, node in enumerate(self._order):
+            self._position[node] = position
+
+        # Caches are per instance, each counter owns its vectors
+        self.forward = lru_cache(maxsize=maxsize)(self._forward)
+        self.backward = lru_cache(maxsize=maxsize)(self._backward)
+
+    def _forward(self, source: int) -> list[int]:
+        """ Number of paths from the source id to every node id """
+        paths = [0] * len(self.network)
+        paths[source] = 1
+        for node in self._order[self._position[source]:]:
+            if paths[node]:
+                for neighbor in self._successors[node]:
+                    paths[neighbor] += paths[node]
+        return paths
+
+    def _backward(self, target: int) -> list[int]:
+        """ Number of paths from every node id to the target id """
+        paths = [0] * len(self.network)
+        paths[target] = 1
+        for node in reversed(self._order[:self._position[target]]):
+            paths[node] = sum(paths[neighbor] for neighbor in self._successors[node])
+        return paths
+
+    def count(self, source: str, target: str, via: Iterable[str] = ()) -> int:
+        """
+        Count the paths from source to target going through all the `via` nodes.
+
+        In a DAG the via nodes can only be visited in topological order, so the path is split
+        into legs between consecutive stops, the last leg using the target's backward vector.
+        """
+        ids = self.network.ids
+        if any(node not in ids for node in [source, target, *via]):
+            return 0
+
+        stops = [ids[source], *sorted({ids[node] for node in via}, key=self._position.__getitem__)]
+        total = 1
+        for a, b in zip(stops, stops[1:]):
+            total *= self.forward(a)[b]
+            if not total:
+                return 0
+        return total * self.backward(ids[target])[stops[-1]]
+
+@instrument
+def parse(content: str) -> tuple[CSRGraph]:
+    """
+    Both parts take the device network.
+    """
+    return (parse_raw(content),)
+
+def generate(size: int, seed: int = 0) -> str:
+    """
+    Synthetic device network (a DAG) of `size` devices besides the named ones, for benchmarks.
+    """
+    rng = random.Random(seed)
+    # Numbered names never collide with each other or with the named devices
+    names = [f"d{i}" for i in range(size)]
+    rng.shuffle(names)
+    # Devices only connect to devices after them, the named ones spread along the way
+    order = ["svr", *names]
+    for i, name in enumerate(("you", "fft", "dac")):
+        order.insert((i + 1) * len(order) // 4, name)
+    order.append("out")
+
+    lines = []
+    for i, device in enumerate(order[:-1]):
+        later = order[i + 1:i + 1 + max(size // 10, 4)]
+        lines.append(f"{device}: " + " ".join(rng.sample(later, min(len(later), rng.randint(1, 4)))))
+    return "\n".join(lines)
 
 def main(fp_input: str) -> None:
     """
     Args:
         fp_input: input file path containing the dials (line by line)
     """
-    logger.info(f"Your password is encrypted in: {fp_input}")
+    logger.info("Your password is encrypted in: %s", fp_input)
     
     # Read input file content 
     with open(fp_input, "r", encoding="utf-8") as f:
         content = f.read()
-    device_network = parse_raw(content)
-    logger.debug(f"File content - \n{device_network}")
+    device_network, = parse(content)
+    logger.debug("File content - \n%s", device_network)
 
 
-    # result = part_1(device_network)
-    # logger.info(f"Solved for {fp_input}, use (part 1): {result}")
+    result = part_1(device_network)
+    logger.info("Solved for %s, use (part 1): %s", fp_input, result)
 
     result = part_2(device_network)
-    logger.info(f"Solved for {fp_input}, use (part 2): {result}")
+    logger.info("Solved for %s, use (part 2): %s", fp_input, result)
 
 
 if __name__ == "__main__":
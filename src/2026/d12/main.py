@@ -1,45 +1,342 @@
 import numpy as np
+import random
+import time
+
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import chain, islice
+from typing import NamedTuple
 
 # Internal imports
 from src.utils.logger import get_logger
+from src.utils.profiling import instrument
+from src.utils.shared import SharedArray, attach, detach, shared_arrays
 
 logger = get_logger(__name__)
 
 
-def part_1(areas: np.ndarray, tree_fits: list) -> int:
+class PackingSummary(NamedTuple):
+    """ How the regions were decided """
+    fits: int # regions proven to fit their presents
+    by_filter: int # regions decided by the area or bounding square checks
+    by_search: int # regions decided by the exact search
+    timed_out: int # regions whose search ran out of time, counted as not fitting
+
+
+def parse_shape(package: str) -> list[tuple[int, int]]:
+    """
+    Cells (row, col) of a present shape, e.g. "0:\\n###\\n##.\\n##." -> [(0, 0), (0, 1), ...]
+    """
+    _index, *rows = package.splitlines()
+    return [(r, c) for r, row in enumerate(rows) for c, char in enumerate(row) if char == "#"]
+
+def orientations(cells: list[tuple[int, int]]) -> list[tuple[tuple[int, int], ...]]:
+    """
+    All distinct rotations and flips of a shape, each normalized to start at (0, 0)
+    and with its cells sorted in row-major order.
+    """
+    variants = set()
+    for flip in (False, True):
+        shape = [(r, -c) if flip else (r, c) for r, c in cells]
+        for _ in range(4):
+            # Rotate by 90 degrees
+            shape = [(c, -r) for r, c in shape]
+            min_r, min_c = min(r for r, _ in shape), min(c for _, c in shape)
+            variants.add(tuple(sorted((r - min_r, c - min_c) for r, c in shape)))
+    return sorted(variants)
+
+def anchored_placements(shapes: list[list[tuple[int, int]]], width: int, height: int) -> list[list[tuple[int, int]]]:
+    """
+    Bitboard placements of every shape orientation, grouped by their anchor cell.
+
+    Cell (r, c) of the region is bit r * width + c. The anchor of a placement is its first cell
+    in row-major order, so placements[cell] holds (shape index, mask) of everything that covers
+    `cell` as its first cell.
     """
+    placements = [[] for _ in range(width * height)]
+    for k, shape in enumerate(shapes):
+        for variant in orientations(shape):
+            anchor_r, anchor_c = variant[0]
+            for r in range(height):
+                for c in range(width):
+                    cells = [(r + dr - anchor_r, c + dc - anchor_c) for dr, dc in variant]
+                    if all(0 <= cr < height and 0 <= cc < width for cr, cc in cells):
+                        mask = sum(1 << (cr * width + cc) for cr, cc in cells)
+                        placements[r * width + c].append((k, mask))
+    return placements
+
+def search_packing(shapes: list[list[tuple[int, int]]], width: int, height: int, counts: list[int],
+                   deadline: float | None = None) -> bool:
     """
-    # for region_area, fit in tree_fits:
-    #     logger.debug(f"region_area, fit - {region_area, fit}")
-    #     logger.debug(f"areas @ fit - {areas @ fit}")
-    return sum(region_area >= areas @ fit for region_area, fit in tree_fits)
+    Exact backtracking search for a packing of `counts[k]` copies of every shape k.
 
-def main(fp_input: str) -> None:
+    The first free cell is always decided next: either a remaining piece is anchored on it or,
+    while there is slack (free area not needed by the pieces), it is left empty. The search is
+    iterative, a stack of move generators, so large regions don't hit the recursion limit,
+    and boards already proven to be dead ends are not explored again.
+
+    Raises:
+        TimeoutError: if the search is still running at `deadline` (a `time.monotonic` value)
     """
+    counts = list(counts)
+    area = width * height
+    slack = area - sum(n * len(shape) for n, shape in zip(counts, shapes))
+    if slack < 0:
+        return False
+    if not any(counts):
+        return True
+
+    placements = anchored_placements(shapes, width, height)
+    full = (1 << area) - 1
+
+    def wasted(board: int, cell: int) -> int:
+        """
+        Free cells that no remaining piece can cover anymore, they must stay empty. Every cell
+        before `cell` is decided, so only placements anchored from `cell` on are possible.
+        """
+        coverable = 0
+        for anchored in placements[cell:]:
+            for k, mask in anchored:
+                if counts[k] and not board & mask:
+                    coverable |= mask
+        return (full & ~board & ~coverable).bit_count()
+
+    def moves(board: int, slack: int, cell: int) -> Iterator[tuple[int, int]]:
+        """ Boards reachable by deciding `cell`, the counts are updated while a move is explored """
+        for k, mask in placements[cell]:
+            if counts[k] and not board & mask:
+                counts[k] -= 1
+                yield board | mask, slack
+                counts[k] += 1
+        if slack:
+            yield board | (1 << cell), slack - 1
+
+    # Boards (with the pieces still left) known to have no solution, the same board is
+    # often reached by placing the same pieces in a different order
+    dead_ends = set()
+    stack = [(moves(0, slack, 0), (0, tuple(counts)))]
+    nodes = 0
+    while stack:
+        nodes += 1
+        if deadline is not None and not nodes % 1024 and time.monotonic() > deadline:
+            raise TimeoutError(f"No packing decided for {width}x{height}: {counts} in time")
+        for board, slack in stack[-1][0]:
+            if not any(counts):
+                return True
+            # Lowest unset bit is the first free cell
+            cell = (~board & (board + 1)).bit_length() - 1
+            state = (board, tuple(counts))
+            if cell >= area or state in dead_ends:
+                continue
+            if wasted(board, cell) > slack:
+                dead_ends.add(state)
+                continue
+            stack.append((moves(board, slack, cell), state))
+            break
+        else:
+            dead_ends.add(stack.pop()[1])
+
+    return False
+
+def parse_regions(lines: Iterable[str], nshapes: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Parse region lines, e.g. "12x5: 1 0 1 0 2 2", in one pass.
+
+    Returns: (regions, 2) matrix of the region width and height and (regions, shapes) matrix
+        of how many of each present go under the tree
+    """
+    text = " ".join(lines).replace("x", " ").replace(":", " ")
+    table = np.array(text.split(), dtype=np.int64).reshape(-1, 2 + nshapes)
+    return table[:, :2], table[:, 2:]
+
+def read_shapes(lines: Iterable[str]) -> tuple[list[list[tuple[int, int]]], Iterator[str]]:
+    """
+    Parse the present shapes at the start of the input lines (e.g. an open file), reading no
+    further than the first region line.
+
+    Returns: cells of each shape and the remaining lines, the regions
+    """
+    lines = iter(lines)
+    packages, package = [], []
+    for line in lines:
+        # Region lines start with their size, e.g. "12x5:", shape lines with their index
+        if "x" in line.partition(":")[0]:
+            lines = chain([line], lines)
+            break
+        if line.strip():
+            package.append(line.rstrip("\r\n"))
+        elif package:
+            packages.append("\n".join(package))
+            package = []
+    if package:
+        packages.append("\n".join(package))
+    return [parse_shape(package) for package in packages], lines
+
+def iter_regions(lines: Iterable[str], nshapes: int, chunk_size: int = 100_000) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """
+    Stream region lines (e.g. an open file) in chunks of `chunk_size` parsed regions,
+    so huge region lists never have to be in memory at once.
+    """
+    # Skip the blank lines before chunking, a chunk of only blank lines isn't the end of the input
+    lines = (line for line in lines if line.strip())
+    while chunk := list(islice(lines, chunk_size)):
+        yield parse_regions(chunk, nshapes)
+
+def _search_region(shapes: list[list[tuple[int, int]]], width: int, height: int, counts: list[int],
+                   budget: float | None) -> bool | None:
+    """ Process pool task, search a single region within its time budget (None if it ran out) """
+    deadline = None if budget is None else time.monotonic() + budget
+    try:
+        return search_packing(shapes, width, height, counts, deadline)
+    except TimeoutError:
+        return None
+
+def _search_shared(shapes: list[list[tuple[int, int]]], dims_ref: SharedArray, counts_ref: SharedArray,
+                   region: int, budget: float | None) -> bool | None:
+    """ Process pool task, search a region of the dims and counts shared by `pack_regions` """
+    dims, counts = attach(dims_ref), attach(counts_ref)
+    try:
+        width, height, region_counts = int(dims[region, 0]), int(dims[region, 1]), counts[region].tolist()
+    finally:
+        # Only this region's numbers are needed, don't keep the blocks mapped until the worker exits
+        detach(dims_ref, counts_ref)
+    return _search_region(shapes, width, height, region_counts, budget)
+
+def pack_regions(shapes: list[list[tuple[int, int]]], dims: np.ndarray, counts: np.ndarray,
+                 workers: int = 1, budget: float | None = None) -> PackingSummary:
+    """
+    Decide all the regions, the cheap checks run for all regions at once as matrix-vector
+    products and only the regions neither of them decides are searched.
+
     Args:
-        fp_input: input file path containing the dials (line by line)
+        shapes: cells of each present shape
+        dims: (regions, 2) width and height of each region
+        counts: (regions, shapes) number of each present per region
+        workers: searches run in a process pool of this size when larger than 1
+        budget: seconds each region's search may take, regions running out count as not fitting
+
+    Returns: the summary of how many regions fit and how they were decided
     """
-    logger.info(f"Your password is encrypted in: {fp_input}")
-    
-    # Read input file content 
-    with open(fp_input, "r", encoding="utf-8") as f:
-        content = f.read()
+    areas = np.array([len(shape) for shape in shapes])
+    sides = np.array([max(max(r, c) for r, c in shape) + 1 for shape in shapes])
+
+    fits_area = counts @ areas <= dims[:, 0] * dims[:, 1]
+    # Side of the largest bounding square among the presents of each region
+    side = (sides * (counts > 0)).max(axis=1, initial=1)
+    fits_squares = counts.sum(axis=1) <= (dims[:, 0] // side) * (dims[:, 1] // side)
+
+    undecided = np.flatnonzero(fits_area & ~fits_squares)
+    # logger.debug(f"undecided regions - {len(undecided)}")
+
+    if workers > 1 and len(undecided) > 1:
+        # Workers read the regions from shared memory, a task is only the index of its region.
+        # Each search stops at the first packing it finds, and whatever is still queued is
+        # cancelled if we leave early (e.g. interrupted)
+        with shared_arrays(dims, counts) as (dims_ref, counts_ref), \
+                ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_search_shared, shapes, dims_ref, counts_ref, int(i), budget) for i in undecided
+            ]
+            try:
+                results = [future.result() for future in as_completed(futures)]
+            except BaseException:
+                executor.shutdown(cancel_futures=True)
+                raise
+    else:
+        results = [
+            _search_region(shapes, int(dims[i, 0]), int(dims[i, 1]), counts[i].tolist(), budget) for i in undecided
+        ]
+
+    return PackingSummary(
+        fits=int(np.count_nonzero(fits_area & fits_squares)) + results.count(True),
+        by_filter=len(dims) - len(undecided),
+        by_search=len(undecided) - results.count(None),
+        timed_out=results.count(None),
+    )
+
+def pack_region_lines(shapes: list[list[tuple[int, int]]], lines: Iterable[str], workers: int = 1,
+                      budget: float | None = None, chunk_size: int = 100_000) -> PackingSummary:
+    """
+    Decide the regions of streamed region lines (e.g. the rest of an open file), chunk by
+    chunk with `pack_regions`, and add up the summaries of the chunks.
+    """
+    summaries = [
+        pack_regions(shapes, dims, counts, workers, budget)
+        for dims, counts in iter_regions(lines, len(shapes), chunk_size)
+    ]
+    return PackingSummary(*map(sum, zip(*summaries))) if summaries else PackingSummary(0, 0, 0, 0)
+
+def report(summary: PackingSummary) -> int:
+    """ Log how the regions were decided, returns the number of regions that fit """
+    logger.debug("Regions decided by filter: %s, by search: %s, timed out: %s", summary.by_filter, summary.by_search, summary.timed_out)
+    if summary.timed_out:
+        logger.warning("%s regions ran out of time and were counted as not fitting", summary.timed_out)
+    return summary.fits
+
+@instrument
+def part_1(shapes: list[list[tuple[int, int]]], dims: np.ndarray, counts: np.ndarray,
+           workers: int = 1, budget: float | None = None) -> int:
+    """
+    Count the regions under the trees that can fit all of their presents.
+    """
+    return report(pack_regions(shapes, dims, counts, workers, budget))
+
+@instrument
+def parse(content: str) -> tuple[list[list[tuple[int, int]]], np.ndarray, np.ndarray]:
+    """
+    Args:
+        content: content of the input file, the present shapes and then the regions
 
+    Returns: cells of each shape, (regions, 2) region sizes and (regions, shapes) present counts
+    """
     *packages, trees = content.split("\n\n")
-    areas = np.array([package.count("#") for package in packages])
+    shapes = [parse_shape(package) for package in packages]
+    dims, counts = parse_regions(trees.splitlines(), len(shapes))
+    return shapes, dims, counts
 
-    tree_regionfits = []
-    for tree in trees.splitlines():
-        region, fits = tree.split(": ")
-        h, w = region.split('x')
-        region_area = int(h)*int(w)
-        fits = np.array(fits.split(), dtype=int)
-        tree_regionfits.append((region_area, fits))
+def generate(size: int, seed: int = 0) -> str:
+    """
+    Synthetic input of six present shapes and `size` large regions, for benchmarks.
+    """
+    rng = random.Random(seed)
+    shapes = []
+    for index in range(6):
+        # Always keep the corners so every shape spans 3x3
+        cells = [rng.random() < 0.6 or (r, c) in {(0, 0), (2, 2)} for r in range(3) for c in range(3)]
+        rows = ["".join("#" if cells[3 * r + c] else "." for c in range(3)) for r in range(3)]
+        shapes.append(f"{index}:\n" + "\n".join(rows))
 
-    # logger.debug(f"tree_regionfits - {tree_regionfits}")
+    smallest = min(shape.count("#") for shape in shapes)
 
-    result = part_1(areas, tree_regionfits)
-    logger.info(f"Solved for {fp_input}, use (part 1): {result}")
+    regions = []
+    for _ in range(size):
+        width, height = rng.randint(35, 50), rng.randint(35, 50)
+        # Like the real input, regions either clearly fit (a 3x3 square per present)
+        # or clearly don't (more area than the region)
+        if rng.random() < 0.6:
+            total = rng.randint(1, (width // 3) * (height // 3))
+        else:
+            total = width * height // smallest + 1
+        counts = [0] * 6
+        for _ in range(total):
+            counts[rng.randrange(6)] += 1
+        regions.append(f"{width}x{height}: " + " ".join(map(str, counts)))
+    return "\n\n".join(shapes) + "\n\n" + "\n".join(regions)
+
+def main(fp_input: str, workers: int = 1, budget: float | None = None) -> None:
+    """
+    Args:
+        fp_input: input file path containing the dials (line by line)
+        workers: number of processes searching the regions the checks can't decide
+        budget: seconds each region's search may take
+    """
+    logger.info("Your password is encrypted in: %s", fp_input)
+
+    # Stream the regions from the open file in chunks, huge region lists are never read at once
+    with open(fp_input, "r", encoding="utf-8") as f:
+        shapes, region_lines = read_shapes(f)
+        result = report(pack_region_lines(shapes, region_lines, workers, budget))
+    logger.info("Solved for %s, use (part 1): %s", fp_input, result)
 
 
 if __name__ == "__main__":
@@ -1,5 +1,8 @@
+import random
+
 # Internal imports
 from src.utils.logger import get_logger
+from src.utils.profiling import instrument
 
 logger = get_logger(__name__)
 
@@ -42,6 +45,7 @@ def invalids(start: int, end: int):
                 seen.add(possible)
                 yield possible
                 
+@instrument
 def part_1(ranges: list[tuple[int, int]]) -> int:
     """
     Args:
@@ -56,6 +60,7 @@ def part_1(ranges: list[tuple[int, int]]) -> int:
     
     return total
 
+@instrument
 def part_2(ranges: list[tuple[int, int]]) -> int:
     """
     Args:
@@ -65,31 +70,52 @@ def part_2(ranges: list[tuple[int, int]]) -> int:
     return sum(sum(invalids(start, end)) for start, end in ranges)
 
 
+@instrument
+def parse(content: str) -> tuple[list[tuple[int, int]]]:
+    """
+    Args:
+        content: content of the input file, comma separated "start-end" ranges
+
+    Returns: list of the (start, end) ranges
+    """
+    ranges = []
+    # for each part in the content create a start-end tuple
+    for part in content.replace("\n", "").split(","):
+        if "-" in part:
+            start, end = map(int, part.split("-"))
+            ranges.append((start, end))
+    return (ranges,)
+
+def generate(size: int, seed: int = 0) -> str:
+    """
+    Synthetic input of `size` ranges of up to a thousand IDs each, for benchmarks.
+    """
+    rng = random.Random(seed)
+    ranges = []
+    for _ in range(size):
+        start = rng.randint(1, 10 ** rng.randint(2, 10))
+        ranges.append(f"{start}-{start + rng.randint(0, 1000)}")
+    return ",".join(ranges)
+
 def main(fp_input: str) -> None:
     """
     
     Args:
         fp_input: input file path
     """
-    logger.info(f"Input file path: {fp_input}")
+    logger.info("Input file path: %s", fp_input)
 
-    ranges = []
     # Read input file content 
     with open(fp_input, "r", encoding="utf-8") as f:
-        content = f.read().replace("\n", "")
-    # for each part in the content create a start-end tuple
-    for part in content.split(","):
-        if "-" in part:
-            start, end = map(int, part.split("-"))
-            ranges.append((start, end))
+        ranges, = parse(f.read())
     
     # logger.debug(f"Ranges parsed: {ranges}")
 
     result = part_1(ranges)
-    logger.info(f"Solved for {fp_input}, use (part 1): {result}")
+    logger.info("Solved for %s, use (part 1): %s", fp_input, result)
     
     result = part_2(ranges)
-    logger.info(f"Solved for {fp_input}, use (part 2): {result}")
+    logger.info("Solved for %s, use (part 2): %s", fp_input, result)
 
  
 if __name__ == "__main__":
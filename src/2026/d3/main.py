@@ -1,9 +1,13 @@
+import random
+
 # Internal imports
 from src.utils.logger import get_logger
+from src.utils.profiling import instrument
 
 logger = get_logger(__name__)
 
 
+@instrument
 def part_1(banks: list[str]) -> int:
     """
     Find sum of the maximum joltage (2 digit) from each battery bank.
@@ -48,6 +52,7 @@ def max_subseq_k(bank: str, d: int) -> int:
     # truncate from the end
     return int(''.join(joltage[:d]))
 
+@instrument
 def part_2(banks: list[str], nob: int=12) -> int:
     """
     Find sum of the maximum joltage (by default 12 batteries) from each battery bank.
@@ -67,30 +72,46 @@ def part_2(banks: list[str], nob: int=12) -> int:
 
     return total
 
+@instrument
+def parse(content: str) -> tuple[list[str]]:
+    """
+    Args:
+        content: content of the input file, a battery bank per line
+
+    Returns: list of battery banks
+    """
+    return ([line.strip() for line in content.splitlines() if line.strip()],)
+
+def generate(size: int, seed: int = 0) -> str:
+    """
+    Synthetic input of `size` battery banks of 100 batteries, for benchmarks.
+    """
+    rng = random.Random(seed)
+    return "\n".join("".join(rng.choices("123456789", k=100)) for _ in range(size))
+
 def main(fp_input: str) -> None:
     """
     
     Args:
         fp_input: input file path containing the dials (line by line)
     """
-    logger.info(f"Your password is encrypted in: {fp_input}")
+    logger.info("Your password is encrypted in: %s", fp_input)
 
-    banks = []
     # Read input file content 
     with open(fp_input, "r", encoding="utf-8") as f:
-        banks.extend([line.strip() for line in f if line.strip()])
+        banks, = parse(f.read())
     
-    logger.debug(f"Battery Banks len- {len(banks)}")
+    logger.debug("Battery Banks len- %s", len(banks))
     # logger.debug(f"Battery Banks - {banks}")
 
     result = part_1(banks)
-    logger.info(f"Solved for {fp_input}, use (part 1): {result}")
+    logger.info("Solved for %s, use (part 1): %s", fp_input, result)
 
     result = part_2(banks, nob=2)
-    logger.info(f"Solved for {fp_input}, use (part 2 for p1): {result}")
+    logger.info("Solved for %s, use (part 2 for p1): %s", fp_input, result)
 
     result = part_2(banks)
-    logger.info(f"Solved for {fp_input}, use (part 2): {result}")
+    logger.info("Solved for %s, use (part 2): %s", fp_input, result)
 
 
 if __name__ == "__main__":
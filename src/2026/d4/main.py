@@ -1,42 +1,64 @@
 import numpy as np
-
-from scipy.ndimage import convolve
+import random
 
 # Internal imports
+from src.utils.grid import Grid, neighbour_count
 from src.utils.logger import get_logger
+from src.utils.profiling import instrument
 
 logger = get_logger(__name__)
 
 
-def part_1(grid: np.ndarray, kernel: np.ndarray) -> int:
+@instrument
+def part_1(grid: np.ndarray) -> int:
     """
     Args:
+        grid: True where there is a roll of paper
 
-    Returns:
+    Returns: number of rolls with fewer than 4 rolls around them
     """
-    neighbours = convolve(grid, kernel, mode="constant")
+    neighbours = neighbour_count(grid)
     # logger.debug(f"Neighbours - {neighbours}")
     # logger.debug(f"Total Logical op - {np.logical_and(grid, neighbours < 4)}")
     # logger.debug(f"Total - {np.logical_and(grid, neighbours < 4).sum()}")
 
-    return np.logical_and(grid, neighbours < 4).sum()
+    return int(np.logical_and(grid, neighbours < 4).sum())
 
 
-def part_2(grid: np.ndarray, kernel: np.ndarray) -> int:
+@instrument
+def part_2(grid: np.ndarray) -> int:
     """
     Args:
+        grid: True where there is a roll of paper
 
-    Returns: 
+    Returns: number of rolls removed by repeatedly removing the accessible ones
     """
     rolls = grid.copy()
 
     while True:
         # logger.debug(f"rolls - {rolls}, grid sum - {grid.sum()}, rolls sum - {rolls.sum()}")
-        to_remove = np.logical_and(rolls, convolve(rolls, kernel, mode="constant") < 4)
+        to_remove = np.logical_and(rolls, neighbour_count(rolls) < 4)
         # logger.debug(f"to_remove - {to_remove}")
         if not to_remove.any():
-            return grid.sum() - rolls.sum()
-        rolls -= to_remove
+            return int(grid.sum() - rolls.sum())
+        rolls &= ~to_remove
+
+@instrument
+def parse(content: str) -> tuple[np.ndarray]:
+    """
+    Args:
+        content: content of the input file, a grid where "@" marks rolls of paper
+
+    Returns: grid with True for rolls of paper
+    """
+    return (Grid(content).mask("@"),)
+
+def generate(size: int, seed: int = 0) -> str:
+    """
+    Synthetic input of a `size` x `size` grid, about 60% rolls of paper, for benchmarks.
+    """
+    rng = random.Random(seed)
+    return "\n".join("".join(rng.choices("@.", weights=(6, 4), k=size)) for _ in range(size))
 
 def main(fp_input: str) -> None:
     """
@@ -44,27 +66,20 @@ def main(fp_input: str) -> None:
     Args:
         fp_input: input file path containing the dials (line by line)
     """
-    logger.info(f"Your password is encrypted in: {fp_input}")
+    logger.info("Your password is encrypted in: %s", fp_input)
 
-    grid = []
-    # Read input file content 
+    # Read input file content and convert to np array
     with open(fp_input, "r", encoding="utf-8") as f:
-        grid.extend([line.strip() for line in f if line.strip()])
+        grid, = parse(f.read())
     
-    logger.debug(f"Grid with rolls of paper len - {len(grid)}")
-
-    # Convert to np array
-    grid = np.array([[int(col=='@') for col in row] for row in grid], dtype=int)
+    logger.debug("Grid with rolls of paper len - %s", len(grid))
     # logger.debug(f"Grid with rolls of paper - {grid}")
 
-    # Define kernel to be used, all 8 adjacent neighbours
-    kernel = np.array([[1, 1, 1], [1, 0, 1], [1, 1, 1]])
-    
-    result = part_1(grid, kernel)
-    logger.info(f"Solved for {fp_input}, use (part 1): {result}")
+    result = part_1(grid)
+    logger.info("Solved for %s, use (part 1): %s", fp_input, result)
     
-    result = part_2(grid, kernel)
-    logger.info(f"Solved for {fp_input}, use (part 2): {result}")
+    result = part_2(grid)
+    logger.info("Solved for %s, use (part 2): %s", fp_input, result)
 
 
 if __name__ == "__main__":
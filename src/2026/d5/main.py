@@ -1,9 +1,20 @@
+import random
+
+from typing import TYPE_CHECKING
+
 # Internal imports
 from src.utils.logger import get_logger
+from src.utils.profiling import instrument
+
+# numpy is only imported by the functions using it, part 1 and the parser stay free of its
+# start-up cost
+if TYPE_CHECKING:
+    import numpy as np
 
 logger = get_logger(__name__)
 
 
+@instrument
 def part_1(ranges: list, ingredients: list) -> int:
     """
     Args:
@@ -49,17 +60,57 @@ def merge_overlapping_ranges(ranges: list) -> list:
     # logger.debug(f"Non-overlapping ranges - {no_ranges}")
     return no_ranges
 
+def merge_ranges_np(starts: "np.ndarray", ends: "np.ndarray", adjacent: bool = False) -> tuple["np.ndarray", "np.ndarray", int]:
+    """
+    Vectorized merge of inclusive ranges, for millions of them.
+
+    Sorted by start, a range begins a new merged range when it starts after the furthest end
+    of all the ranges before it (the running maximum of the ends), otherwise it extends the
+    current one up to that running maximum.
+
+    Args:
+        starts: start of each range
+        ends: (inclusive) end of each range
+        adjacent: also merge ranges that only touch, e.g. 1-3 and 4-6 into 1-6
+
+    Returns: starts and ends of the merged, sorted and non-overlapping ranges, and the number of
+        IDs they cover
+    """
+    import numpy as np
+
+    if len(starts) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), 0
+
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], ends[order]
+    reach = np.maximum.accumulate(ends)
+
+    # First range of each merged range, the start is past the reach of every range before it
+    is_first = np.empty(len(starts), dtype=bool)
+    is_first[0] = True
+    np.greater(starts[1:], reach[:-1] + int(adjacent), out=is_first[1:])
+    first = np.flatnonzero(is_first)
+
+    # The reach at the last range of each merged range is its end
+    merged_starts = starts[first]
+    merged_ends = reach[np.append(first[1:] - 1, len(starts) - 1)]
+    return merged_starts, merged_ends, int((merged_ends - merged_starts + 1).sum())
+
+@instrument
 def part_2(ranges: list) -> int:
     """
     Args:
+        ranges: fresh ID ranges, (start, end) inclusive
 
-    Returns: 
+    Returns: number of IDs covered by the fresh ID ranges
     """
-    # merge ranges so that overlapping ranges are catered for
-    ranges = merge_overlapping_ranges(ranges)
+    import numpy as np
 
-    # return sum of merged ranges (+1 to cater for inclusivity)
-    return sum(end-start+1 for start, end in ranges)
+    # merge ranges so that overlapping ranges are catered for, the coverage counts the merged
+    # ranges inclusively
+    bounds = np.array(ranges, dtype=np.int64).reshape(-1, 2)
+    _, _, coverage = merge_ranges_np(bounds[:, 0], bounds[:, 1])
+    return coverage
 
 def parse_food_db(food_db: str) -> tuple[list[tuple[int, ...]], list[int]]:
     """
@@ -92,32 +143,54 @@ def parse_food_db(food_db: str) -> tuple[list[tuple[int, ...]], list[int]]:
 
     return valid_ranges, ingredients
 
+@instrument
+def parse(content: str) -> tuple[list[tuple[int, ...]], list[int]]:
+    """
+    Args:
+        content: content of the input file, the fresh ID ranges and the available ingredients
+
+    Returns: the fresh ID ranges and the ingredient IDs
+    """
+    return parse_food_db(content)
+
+def generate(size: int, seed: int = 0) -> str:
+    """
+    Synthetic input of `size` fresh ID ranges and `size` ingredients, for benchmarks.
+    """
+    rng = random.Random(seed)
+    ranges = []
+    for _ in range(size):
+        start = rng.randint(1, 10 ** 14)
+        ranges.append(f"{start}-{start + rng.randint(0, 10 ** 12)}")
+    ingredients = [str(rng.randint(1, 10 ** 14)) for _ in range(size)]
+    return "\n".join(ranges) + "\n\n" + "\n".join(ingredients)
+
 def main(fp_input: str) -> None:
     """
     
     Args:
         fp_input: input file path containing the dials (line by line)
     """
-    logger.info(f"Your password is encrypted in: {fp_input}")
+    logger.info("Your password is encrypted in: %s", fp_input)
 
     content = ""
     # Read input file content 
     with open(fp_input, "r", encoding="utf-8") as f:
         content = f.read()
     
-    logger.debug(f"Food content - {content}")
+    logger.debug("Food content - %s", content)
 
-    valid_ranges, ingredients = parse_food_db(content)
+    valid_ranges, ingredients = parse(content)
     
-    logger.debug(f"valid_ranges - {valid_ranges}")
-    logger.debug(f"ingredients - {ingredients}")
+    logger.debug("valid_ranges - %s", valid_ranges)
+    logger.debug("ingredients - %s", ingredients)
     
     
     result = part_1(valid_ranges, ingredients)
-    logger.info(f"Solved for {fp_input}, use (part 1): {result}")
+    logger.info("Solved for %s, use (part 1): %s", fp_input, result)
     
     result = part_2(valid_ranges)
-    logger.info(f"Solved for {fp_input}, use (part 2): {result}")
+    logger.info("Solved for %s, use (part 2): %s", fp_input, result)
 
 
 if __name__ == "__main__":
@@ -1,16 +1,24 @@
 import numpy as np
+import random
 
 # Internal imports
+from src.utils.grid import Grid
 from src.utils.logger import get_logger
+from src.utils.profiling import instrument
 
 logger = get_logger(__name__)
 
 
-def part_1(content: str) -> int:
+@instrument
+def part_1(grid: Grid) -> int:
     """
+    Args:
+        grid: the worksheet, rows of numbers and a last row of operations
+
+    Returns: grand total of the problems, numbers being read row by row
     """
     # Read values and last line separately, last line contains operators
-    *lines, _last = content.splitlines()
+    *lines, _last = grid.rows()
 
     # Convert values into an np array
     data = np.array([list(map(int, l.split())) for l in lines])
@@ -22,39 +30,71 @@ def part_1(content: str) -> int:
         ValueError(f"Length of the values and corresponding operations dont match - {data.T, ops}")
 
     # for each pair of col (from Transposed matrix) and given operation perform np function and return their sum
-    return sum(np.prod(col) if op == '*' else np.sum(col)
+    return sum(int(np.prod(col)) if op == b'*' else int(np.sum(col))
                for col, op in zip(data.T, ops)
                )
 
-def part_2(content: str) -> int:
+@instrument
+def part_2(grid: Grid) -> int:
     """
-    """
-    # Split content line by line and make sure to also read spaces to cater for positional units
-    data = np.array([list(row) for row in content.splitlines()])
-
-    # Define variables, total to store cummalative sum value after each operation, 
-    # and values array to store integers before an operation is reached
-    total = 0
-    values = []
-    
-    # Tranpose to a column matrix so that we have each position correctly aligned
-    # Iterate over transpose data and calculate when an op is read
-    for col in data.T[::-1]:
-        
-        try:
-            # append int values from the col (except last row which is ops) to our list
-            values.append(int("".join(col[:-1])))
-
-            # check if this col contains an operation, if so then add apply the operation and add to total
-            if np.isin(col[-1], ('*', '+')):
-                total += int(np.prod(values) if col[-1] == '*' else np.sum(values))
+    Args:
+        grid: the worksheet, rows of numbers and a last row of operations
 
-        except:
-            # in case the whole col is empty and values cannot be append then
-            # it means its an empty col and hence we clear and restart
-            values.clear()
+    Returns: grand total of the problems, numbers being read column by column
+    """
+    cells, ops = grid[:-1], grid[-1]
+
+    # Number of each column, reading its digits top to bottom and skipping the spaces. A column
+    # has at most one digit per row, past 18 rows they could overflow int64, use Python ints
+    dtype = np.int64 if len(cells) <= 18 else object
+    is_digit = (cells >= ord("0")) & (cells <= ord("9"))
+    values = np.zeros(grid.width, dtype=dtype)
+    for row, row_is_digit in zip(cells, is_digit):
+        values = np.where(row_is_digit, values * 10 + (row.astype(dtype) - ord("0")), values)
+
+    # Problems are runs of columns separated by empty columns, find where each run starts
+    # among the non-empty columns
+    used = is_digit.any(axis=0)
+    columns = np.flatnonzero(used)
+    starts = np.flatnonzero(np.diff(used.astype(np.int8), prepend=0) == 1)
+    problems = np.searchsorted(columns, starts)
+
+    # Each problem has a single operation under it, the other cells of the row are spaces
+    op = np.maximum.reduceat(ops[columns], problems)
+    sums = np.add.reduceat(values[columns], problems)
+    # A product has at most (columns x rows) digits, multiply as Python ints when that could
+    # overflow int64
+    widths = np.diff(problems, append=len(columns))
+    safe = int(widths.max(initial=0)) * len(cells) <= 18
+    products = np.multiply.reduceat(values[columns] if safe else values[columns].astype(object), problems)
+
+    # Add up as Python ints, the grand total can overflow int64
+    return sum(np.where(op == ord("*"), products, sums).tolist())
+
+@instrument
+def parse(content: str) -> tuple[Grid]:
+    """
+    Both parts read the worksheet differently, so they get the whole grid.
+    """
+    return (Grid(content),)
 
-    return total
+def generate(size: int, seed: int = 0) -> str:
+    """
+    Synthetic worksheet of `size` problems of four numbers, for benchmarks.
+    """
+    rng = random.Random(seed)
+    rows, ops = [[] for _ in range(4)], []
+    for _ in range(size):
+        # Numbers of a problem are aligned in a block as wide as its largest number
+        width = rng.randint(1, 4)
+        numbers = [str(rng.randint(10 ** (width - 1), 10 ** width - 1))]
+        numbers += [str(rng.randint(1, 10 ** rng.randint(1, width) - 1)) for _ in range(3)]
+        rng.shuffle(numbers)
+        align = str.ljust if rng.random() < 0.5 else str.rjust
+        for row, number in zip(rows, numbers):
+            row.append(align(number, width))
+        ops.append(rng.choice("+*").ljust(width))
+    return "\n".join(" ".join(row) for row in [*rows, ops])
 
 def main(fp_input: str) -> None:
     """
@@ -62,19 +102,21 @@ def main(fp_input: str) -> None:
     Args:
         fp_input: input file path containing the dials (line by line)
     """
-    logger.info(f"Your password is encrypted in: {fp_input}")
+    logger.info("Your password is encrypted in: %s", fp_input)
 
     # Read input file content 
     with open(fp_input, "r", encoding="utf-8") as f:
         content = f.read()
 
+    grid, = parse(content)
+
     # Solve for part 1
-    result = part_1(content)
-    logger.info(f"Solved for {fp_input}, use (part 1): {result}")
+    result = part_1(grid)
+    logger.info("Solved for %s, use (part 1): %s", fp_input, result)
 
     # Solve for part 2
-    result = part_2(content)
-    logger.info(f"Solved for {fp_input}, use (part 2): {result}")
+    result = part_2(grid)
+    logger.info("Solved for %s, use (part 2): %s", fp_input, result)
 
 
 if __name__ == "__main__":
@@ -1,11 +1,16 @@
+import random
+
 from collections import Counter
 
 # Internal imports
+from src.utils.grid import Grid
 from src.utils.logger import get_logger
+from src.utils.profiling import instrument
 
 logger = get_logger(__name__)
 
 
+@instrument
 def part_1(start : int, splitters: list[int]) -> int:
     """
     """
@@ -20,6 +25,7 @@ def part_1(start : int, splitters: list[int]) -> int:
             beams.update((splitter - 1, splitter + 1))
     return nsplits
 
+@instrument
 def part_2(start : int, splitters: list[int]) -> int:
     """
     """
@@ -36,30 +42,54 @@ def part_2(start : int, splitters: list[int]) -> int:
     # return sum of all timelines from remaining counter    
     return beams.total()
 
+@instrument
+def parse(content: str) -> tuple[int, list[int]]:
+    """
+    Args:
+        content: content of the input file, the manifold diagram
+
+    Returns: column of the start and the column of every splitter, row by row
+    """
+    # get the columns of the start and of every split charater in our grid, row by row
+    grid = Grid(content)
+    _, start = grid.find("S")
+    _, splitters = grid.find("^")
+    return int(start[0]), splitters.tolist()
+
+def generate(size: int, seed: int = 0) -> str:
+    """
+    Synthetic manifold diagram of `size` splitter rows, for benchmarks.
+    """
+    rng = random.Random(seed)
+    width = 2 * size + 3
+    rows = ["." * (width // 2) + "S" + "." * (width // 2)]
+    for _ in range(size):
+        rows.append("." * width)
+        rows.append("".join(rng.choices(".^", weights=(4, 1), k=width)))
+    return "\n".join(rows)
+
 def main(fp_input: str) -> None:
     """
     
     Args:
         fp_input: input file path containing the dials (line by line)
     """
-    logger.info(f"Your password is encrypted in: {fp_input}")
+    logger.info("Your password is encrypted in: %s", fp_input)
     
     # Read input file content 
     with open(fp_input, "r", encoding="utf-8") as f:
         content = f.read()
     # logger.debug(f"File content - \n{content}")
 
-    # get indices for the start and every split charater in our grid
-    start = content.index("S")
+    start, splitters = parse(content)
     # logger.debug(f"File start - {start}")
-    splitters = [i for row in content.splitlines() for i, char in enumerate(row) if char == '^']
     # logger.debug(f"File splitters - {splitters}")
 
     result = part_1(start, splitters)
-    logger.info(f"Solved for {fp_input}, use (part 1): {result}")
+    logger.info("Solved for %s, use (part 1): %s", fp_input, result)
 
     result = part_2(start, splitters)
-    logger.info(f"Solved for {fp_input}, use (part 2): {result}")
+    logger.info("Solved for %s, use (part 2): %s", fp_input, result)
 
 
 if __name__ == "__main__":
@@ -1,12 +1,15 @@
 import math
+import numpy as np
+import random
 
 from typing import NamedTuple
 from itertools import combinations
-from collections import deque
-from math import prod
+from collections import Counter
+from collections.abc import Iterable
 
 # Internal imports
 from src.utils.logger import get_logger
+from src.utils.profiling import instrument
 from src.utils.helper import UnionFind
 
 logger = get_logger(__name__)
@@ -24,64 +27,103 @@ def get_distance(box1: Box, box2: Box) -> float:
     """
     return math.sqrt((box1.x - box2.x)**2 + (box1.y - box2.y)**2 + (box1.z - box2.z)**2)
 
-def part_1(data: list[str], nconnection: int=1000, ncircuits: int=3) -> int:
+def parse_boxes(data: list[str]) -> np.ndarray:
+    """ (n, 3) int64 array of the "x,y,z" junction boxes """
+    return np.array([list(map(int, points.split(","))) for points in data], dtype=np.int64).reshape(-1, 3)
+
+def sorted_edges(boxes: np.ndarray, limit: int | None = None) -> tuple[np.ndarray, np.ndarray]:
     """
-    Find the n largest circuits from a number of connections and return the product of their sizes.
+    Pairs of boxes sorted by their (squared, so exact) distance, ties in `combinations` order.
+
+    Args:
+        boxes: (n, 3) array of the junction boxes
+        limit: only the `limit` shortest pairs, which are selected without sorting all of them
+
+    Returns: indices of the first and second box of each pair
     """
-    boxes = [Box(*map(int, points.split(","))) for points in data]
-    connections = list(combinations(boxes, 2))
-    connections.sort(key=lambda x: get_distance(x[0], x[1]))
+    first, second = np.triu_indices(len(boxes), k=1)
+    distances = ((boxes[first] - boxes[second]) ** 2).sum(axis=1)
+
+    candidates = np.arange(len(distances))
+    if limit is not None and limit < len(distances):
+        # Every pair as close as the limit-th shortest one, the stable sort then keeps the
+        # earliest of the tied pairs
+        kth = np.partition(distances, limit - 1)[limit - 1]
+        candidates = np.flatnonzero(distances <= kth)
+    order = candidates[np.argsort(distances[candidates], kind="stable")][:limit]
+    return first[order], second[order]
+
+def circuit_products(boxes: np.ndarray, thresholds: Iterable[int], ncircuits: int = 3) -> list[int]:
+    """
+    Product of the sizes of the `ncircuits` largest circuits after connecting the closest pairs,
+    for many numbers of connections in one pass.
 
-    # logger.debug(f"Boxes - {len(boxes)}")
-    # logger.debug(f"connections - {len(connections)}")
+    The pairs are sorted once and connected in order with a union-find, which keeps a count of
+    the circuits of each size, so the largest circuits are known at every threshold.
 
-    # We can reuse our UnionFind class here as well but lets leave it as is for now
+    Args:
+        boxes: (n, 3) array of the junction boxes
+        thresholds: numbers of connections to report, in any order
+        ncircuits: number of largest circuits multiplied together
 
-    # Build represents connecting n boxes
-    connecting_dict = {box: [] for box in boxes}
-    for box1, box2 in connections[:nconnection]:
-        connecting_dict[box1].append(box2)
-        connecting_dict[box2].append(box1)
-    
-    def find_connected_circuits():
-        """
-        BFS to find all the circuits. A circuit is defined as connected junction boxes.
-        """
-        # set to keep track of boxes
-        visited = set()
-        # list of separate circuits
-        circuits = [] 
-        
-        for box in boxes:
-            if box in visited:
+    Returns: the product for each threshold, in the order of `thresholds`
+    """
+    thresholds = list(thresholds)
+    first, second = sorted_edges(boxes, max(thresholds, default=0))
+    first, second = first.tolist(), second.tolist()
+
+    # Union-find over box indices, by size and with path halving
+    parents = list(range(len(boxes)))
+    sizes = [1] * len(boxes)
+    circuits = Counter({1: len(boxes)}) if len(boxes) else Counter()
+
+    def find(box: int) -> int:
+        while parents[box] != box:
+            parents[box] = parents[parents[box]]
+            box = parents[box]
+        return box
+
+    def largest_product() -> int:
+        if circuits.total() < ncircuits:
+            raise ValueError(f"Not enough circuits found: {circuits.total()} < {ncircuits}")
+        product, needed = 1, ncircuits
+        for size in sorted(circuits, reverse=True):
+            count = min(circuits[size], needed)
+            product *= size ** count
+            needed -= count
+            if not needed:
+                return product
+
+    products, connected = {}, 0
+    for threshold in sorted(set(thresholds)):
+        for box1, box2 in zip(first[connected:threshold], second[connected:threshold]):
+            root1, root2 = find(box1), find(box2)
+            if root1 == root2:
                 continue
-                
-            # A circuit set to find connected boxes
-            circuit = set() 
-            queue = deque([box]) # For efficient queue operations
-            visited.add(box)
-            
-            # Process all connected boxes in this circuit
-            while queue:
-                current = queue.popleft()
-                circuit.add(current)
-                
-                for neighbor in connecting_dict[current]:
-                    if neighbor not in visited:
-                        visited.add(neighbor)
-                        queue.append(neighbor)
-            
-            circuits.append(circuit)
-
-        return circuits
-    
-    # Find n largest circuits and multiply their len
-    circuits = find_connected_circuits()
-    assert len(circuits) >= ncircuits, f"Not enough circuits found: {len(circuits)} < {ncircuits}"
-    circuits.sort(key=len, reverse=True) # Sort, largest first
-    return prod([len(c) for c in circuits[:ncircuits]]) # len(circuits[0]) * len(circuits[1]) * len(circuits[2]))
+            if sizes[root1] < sizes[root2]:
+                root1, root2 = root2, root1
+            # Two circuits become one, as large as both of them
+            for size in (sizes[root1], sizes[root2]):
+                circuits[size] -= 1
+                if not circuits[size]:
+                    del circuits[size]
+            parents[root2] = root1
+            sizes[root1] += sizes[root2]
+            circuits[sizes[root1]] += 1
+        connected = max(connected, threshold)
+        products[threshold] = largest_product()
+
+    return [products[threshold] for threshold in thresholds]
+
+@instrument
+def part_1(data: list[str], nconnection: int=1000, ncircuits: int=3) -> int:
+    """
+    Find the n largest circuits from a number of connections and return the product of their sizes.
+    """
+    return circuit_products(parse_boxes(data), [nconnection], ncircuits)[0]
 
 
+@instrument
 def part_2(data: list[str]) -> int | None:
     """
     """
@@ -98,25 +140,53 @@ def part_2(data: list[str]) -> int | None:
     
     return None
 
+@instrument
+def parse(content: str) -> tuple[list[str]]:
+    """
+    Both parts take the "x,y,z" lines of the junction boxes.
+    """
+    return ([row for row in content.splitlines()],)
+
+def generate(size: int, seed: int = 0) -> str:
+    """
+    Synthetic input of `size` junction boxes in far apart clusters of about 50 boxes, so
+    there are a few circuits left after the connections, for benchmarks.
+    """
+    rng = random.Random(seed)
+    centers = [[rng.randint(0, 1_000_000) for _ in range(3)] for _ in range(max(size // 50, 3))]
+    boxes = []
+    for _ in range(size):
+        center = rng.choice(centers)
+        boxes.append(",".join(str(c + rng.randint(-5_000, 5_000)) for c in center))
+    return "\n".join(boxes)
+
+def part_kwargs(size: int) -> dict[int, dict[str, int]]:
+    """
+    Number of connections of part 1 for a `generate(size)` input, for benchmarks. The puzzle's
+    1000 connections would join every box of a small input into one circuit, connecting no more
+    than `size - 3` pairs always leaves at least the 3 circuits multiplied together.
+    """
+    return {1: {"nconnection": max(min(1000, size - 3), 0)}}
+
 def main(fp_input: str) -> None:
     """
     
     Args:
         fp_input: input file path containing the dials (line by line)
     """
-    logger.info(f"Your password is encrypted in: {fp_input}")
+    logger.info("Your password is encrypted in: %s", fp_input)
     
     # Read input file content 
     with open(fp_input, "r", encoding="utf-8") as f:
         content = f.read()
     # logger.debug(f"File content - \n{content}")
-    data = [row for row in content.splitlines()]    
+    data, = parse(content)
 
     result = part_1(data, nconnection=1000)
-    logger.debug(f"File result part 1 - {result}")
+    logger.debug("File result part 1 - %s", result)
 
     result = part_2(data)
-    logger.debug(f"File result part 2 - {result}")
+    logger.debug("File result part 2 - %s", result)
 
 
 if __name__ == "__main__":
@@ -1,54 +1,244 @@
+import numpy as np
+import random
+
 from itertools import combinations
-from shapely import Polygon
 
 # Internal imports
 from src.utils.logger import get_logger
+from src.utils.profiling import instrument
 
 logger = get_logger(__name__)
 
 
+def parse_points(data: list[str]) -> np.ndarray:
+    """
+    Parse "x,y" lines into an (n, 2) array of points.
+    """
+    return np.array([list(map(int, p.split(","))) for p in data], dtype=np.int64).reshape(-1, 2)
+
 def area(p1, p2):
-    x1, y1 = map(int, p1.split(","))
-    x2, y2 = map(int, p2.split(","))
+    x1, y1 = p1
+    x2, y2 = p2
 
     return (abs(x2 - x1) + 1) * (abs(y2 - y1) + 1)
 
-def part_1(data: list[str]) -> int:
+def staircase(points: np.ndarray) -> np.ndarray:
+    """
+    Points that no other point dominates towards the lower left, i.e. there is no other
+    point with both a smaller or equal x and y. Flip the signs of the coordinates to get
+    the staircase towards the other corners.
+    """
+    order = np.lexsort((points[:, 1], points[:, 0]))
+    ys = points[order, 1]
+    # Keep a point only if it is strictly lower than every point before it (in x order)
+    lowest_before = np.minimum.accumulate(np.concatenate(([np.iinfo(ys.dtype).max], ys[:-1])))
+    return points[order[ys < lowest_before]]
+
+def max_pair_area(a: np.ndarray, b: np.ndarray, block_size: int = 1024) -> int:
     """
+    Largest rectangle between any point of `a` and any point of `b`, using broadcasting
+    over blocks of `a` to keep the memory bounded.
     """
-    return max(area(a, b) for a, b in combinations(data, 2))
+    best = 0
+    for start in range(0, len(a), block_size):
+        block = a[start:start + block_size, np.newaxis, :]
+        areas = (np.abs(block[..., 0] - b[:, 0]) + 1) * (np.abs(block[..., 1] - b[:, 1]) + 1)
+        best = max(best, int(areas.max(initial=0)))
+    return best
+
+@instrument
+def part_1(points: np.ndarray, block_size: int = 1024) -> int:
+    """
+    Largest rectangle using any two red tiles as opposite corners.
+
+    If a point r is below and left of p, then r makes a larger rectangle than p with any point
+    above and right of them. Hence the largest rectangle goes from the lower left staircase to
+    the upper right one, or from the upper left staircase to the lower right one (the orthogonal
+    hull), and only those pairs are compared.
+    """
+    flip_x, flip_y = np.array([-1, 1]), np.array([1, -1])
+    lower_left, upper_right = staircase(points), -staircase(-points)
+    upper_left, lower_right = flip_y * staircase(flip_y * points), flip_x * staircase(flip_x * points)
+
+    return max(
+        max_pair_area(lower_left, upper_right, block_size),
+        max_pair_area(upper_left, lower_right, block_size),
+    )
 
 def rect(p1, p2):
-    x1, y1 = map(int, p1.split(","))
-    x2, y2 = map(int, p2.split(","))
+    x1, y1 = p1
+    x2, y2 = p2
+    from shapely import Polygon
+
     return Polygon([(x1, y1), (x2, y1), (x2, y2), (x1, y2)])
 
-def part_2(data: list[str]) -> int:
+class CompressedPolygon:
+    """
+    Rectilinear polygon on a coordinate compressed grid with a 2D prefix sum of the cells
+    outside of it, so checking if a rectangle lies inside the polygon is an O(1) lookup.
+
+    Every distinct x (and y) coordinate gets a cell, and so does the open gap between two
+    consecutive coordinates: coordinate i maps to cell 2*i + 1 while cell 0 and the last cell
+    are padding outside the polygon. Each cell is then either completely inside or outside.
+    """
+
+    def __init__(self, points: np.ndarray):
+        self.xs = np.unique(points[:, 0])
+        self.ys = np.unique(points[:, 1])
+        cells = np.column_stack((self.compress_x(points[:, 0]), self.compress_y(points[:, 1])))
+
+        # Draw the polygon edges (consecutive points, wrapping around) on the compressed grid
+        boundary = np.zeros((2 * len(self.xs) + 1, 2 * len(self.ys) + 1), dtype=bool)
+        for (x1, y1), (x2, y2) in zip(cells, np.roll(cells, -1, axis=0)):
+            boundary[min(x1, x2):max(x1, x2) + 1, min(y1, y2):max(y1, y2) + 1] = True
+
+        from scipy.ndimage import binary_fill_holes
+
+        # Everything enclosed by the boundary is inside, the padding keeps the outside connected
+        outside = ~binary_fill_holes(boundary)
+        self._outside = np.zeros((outside.shape[0] + 1, outside.shape[1] + 1), dtype=np.int64)
+        self._outside[1:, 1:] = outside.cumsum(axis=0).cumsum(axis=1)
+
+    def compress_x(self, x: np.ndarray) -> np.ndarray:
+        """ Compressed cell of the x coordinates (must be polygon coordinates) """
+        return 2 * np.searchsorted(self.xs, x) + 1
+
+    def compress_y(self, y: np.ndarray) -> np.ndarray:
+        """ Compressed cell of the y coordinates (must be polygon coordinates) """
+        return 2 * np.searchsorted(self.ys, y) + 1
+
+    def covers(self, x1: np.ndarray, y1: np.ndarray, x2: np.ndarray, y2: np.ndarray) -> np.ndarray:
+        """
+        Vectorized check if the rectangles with corners (x1, y1) and (x2, y2) are covered
+        by the polygon, i.e. there is no outside cell within them.
+        """
+        cx1, cx2 = self.compress_x(np.minimum(x1, x2)), self.compress_x(np.maximum(x1, x2)) + 1
+        cy1, cy2 = self.compress_y(np.minimum(y1, y2)), self.compress_y(np.maximum(y1, y2)) + 1
+        p = self._outside
+        return p[cx2, cy2] - p[cx1, cy2] - p[cx2, cy1] + p[cx1, cy1] == 0
+
+def prepared_covers(points: np.ndarray):
     """
+    Vectorized containment check backed by shapely, the polygon is prepared once and the
+    candidate rectangles are built and tested in bulk with shapely's ufuncs.
     """
-    base_polygon = Polygon([list(map(int, p.split(","))) for p in data])
+    # shapely is only imported by the methods that need it, it dominates the start-up time
+    import shapely
+
+    base_polygon = shapely.Polygon(points)
+    shapely.prepare(base_polygon)
+
+    def covers(x1: np.ndarray, y1: np.ndarray, x2: np.ndarray, y2: np.ndarray) -> np.ndarray:
+        boxes = shapely.box(np.minimum(x1, x2), np.minimum(y1, y2), np.maximum(x1, x2), np.maximum(y1, y2))
+        return shapely.covers(base_polygon, boxes)
+
+    return covers
+
+def largest_covered_area(points: np.ndarray, method: str = "compressed", block_size: int = 1 << 20) -> int:
+    """
+    Largest rectangle, with red tiles as opposite corners, that is covered by the polygon.
+
+    No rectangle of a tile is larger than the one reaching the farthest x and y of any tile.
+    Tiles are taken by descending bound, in blocks pairing them with every tile, and only the
+    pairs larger than the best covered rectangle so far are checked. The search stops at the
+    first block whose bound can't beat it, and memory stays bounded by the block size.
+
+    Args:
+        points: (n, 2) array of the polygon corners, in polygon order
+        method: "compressed" for the prefix sum grid or "prepared" for prepared shapely geometry
+        block_size: number of candidate pairs generated (and checked) at once
+    """
+    if method == "compressed":
+        covers = CompressedPolygon(points).covers
+    elif method == "prepared":
+        covers = prepared_covers(points)
+    else:
+        raise ValueError(f"Unknown method: {method}")
+
+    xs, ys = points[:, 0], points[:, 1]
+    bounds = (np.maximum(xs - xs.min(), xs.max() - xs) + 1) * (np.maximum(ys - ys.min(), ys.max() - ys) + 1)
+    tiles = np.argsort(bounds, kind="stable")[::-1]
+    rows_per_block = max(1, block_size // len(points))
+
+    best = 0
+    for start in range(0, len(tiles), rows_per_block):
+        block = tiles[start:start + rows_per_block]
+        # Bounds are descending, no later tile can beat the best rectangle either
+        if bounds[block[0]] <= best:
+            break
+
+        areas = (np.abs(xs - xs[block, np.newaxis]) + 1) * (np.abs(ys - ys[block, np.newaxis]) + 1)
+        # Each pair once, from its lower index tile (its bound is at least the pair's area)
+        rows, cols = np.nonzero((areas > best) & (np.arange(len(points)) > block[:, np.newaxis]))
+        a, b = block[rows], cols
+        covered = covers(xs[a], ys[a], xs[b], ys[b])
+        best = max(best, int(areas[rows, cols][covered].max(initial=0)))
+
+    return best
+
+@instrument
+def part_2(points: np.ndarray, method: str = "compressed") -> int:
+    """
+    Args:
+        points: (n, 2) array of the red tile coordinates, in polygon order
+        method: "compressed" for the prefix sum grid, "prepared" for batched prepared shapely
+            geometry or "shapely" to check each pair with shapely
+
+    Returns: area of the largest rectangle made only of red and green tiles
+    """
+    if method != "shapely":
+        return largest_covered_area(points, method)
+
+    from shapely import Polygon
+
+    base_polygon = Polygon(points)
+    tiles = [tuple(p) for p in points.tolist()]
     return max(
-        area(a, b) for a, b in combinations(data, 2) if base_polygon.covers(rect(a, b))
+        area(a, b) for a, b in combinations(tiles, 2) if base_polygon.covers(rect(a, b))
     )
 
+@instrument
+def parse(content: str) -> tuple[np.ndarray]:
+    """
+    Both parts take the red tiles parsed once into the same (n, 2) array.
+    """
+    return (parse_points(content.splitlines()),)
+
+def generate(size: int, seed: int = 0) -> str:
+    """
+    Synthetic polygon of about `size` red tiles, the outline of a histogram with random bar
+    widths and heights, for benchmarks.
+    """
+    rng = random.Random(seed)
+    x, tiles = rng.randint(1, 100), []
+    tiles.append((x, 0))
+    for _ in range(max(size // 2 - 1, 1)):
+        height = rng.randint(1, 100_000)
+        tiles.append((x, height))
+        x += rng.randint(1, 1000)
+        tiles.append((x, height))
+    tiles.append((x, 0))
+    return "\n".join(f"{x},{y}" for x, y in tiles)
+
 def main(fp_input: str) -> None:
     """
     Args:
         fp_input: input file path containing the dials (line by line)
     """
-    logger.info(f"Your password is encrypted in: {fp_input}")
+    logger.info("Your password is encrypted in: %s", fp_input)
     
     # Read input file content 
     with open(fp_input, "r", encoding="utf-8") as f:
         content = f.read()
-    redtiles = [row for row in content.splitlines()]  
+    # Parse the red tiles once, both parts work on the same (n, 2) array
+    redtiles, = parse(content)
     # logger.debug(f"File redtiles - \n{redtiles}")
 
     result = part_1(redtiles)
-    logger.info(f"Solved for {fp_input}, use (part 1): {result}")
+    logger.info("Solved for %s, use (part 1): %s", fp_input, result)
 
     result = part_2(redtiles)
-    logger.info(f"Solved for {fp_input}, use (part 2): {result}")
+    logger.info("Solved for %s, use (part 2): %s", fp_input, result)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,163 @@
+"""
+Measure how the solutions scale, using synthetic inputs of growing size.
+
+Every day provides `generate(size, seed)` returning the content of an input file, next to the
+`parse` and parts used by the runner. A day may also provide `part_kwargs(size)`, keyword
+arguments of its parts fitting a generated input of that size, by part number. Each day runs
+over a sweep of sizes, recording the wall time and the peak (tracemalloc) memory of every phase,
+and the results are stored as JSON so a later run can be compared against them. E.g.:
+
+    python -m src.benchmark --days 1 4 --sizes 100 1000 10000 --output bench_output.json
+    python -m src.benchmark --days 1 4 --sizes 100 1000 10000 --compare bench_output.json
+"""
+
+import argparse
+import datetime
+import functools
+import json
+import pathlib
+import platform
+import time
+import tracemalloc
+
+from collections.abc import Callable, Mapping, Sequence
+from types import ModuleType
+from typing import Any
+
+from src.runner import call_part, discover, load_day
+
+
+def measure(module: ModuleType, content: str, parts: Sequence[int] = (1, 2), memory: bool = True,
+            part_kwargs: Mapping[int, dict[str, Any]] | None = None) -> dict[str, Any]:
+    """
+    Run parse and the parts of a day on `content`, timing each phase. `part_kwargs` are the
+    keyword arguments of each part, by part number.
+
+    With `memory`, everything runs a second time under tracemalloc for the peak memory of each
+    phase, so tracing doesn't inflate the timings.
+    """
+    steps: list[tuple[str, Callable[[Any], Any]]] = [("parse", lambda _: module.parse(content))]
+    for part in parts:
+        if (solve := getattr(module, f"part_{part}", None)) is not None:
+            if part_kwargs and part in part_kwargs:
+                solve = functools.partial(solve, **part_kwargs[part])
+            steps.append((f"part {part}", lambda args, solve=solve: call_part(solve, args)))
+
+    record: dict[str, Any] = {"timings": {}, "answers": {}}
+    args = None
+    for phase, step in steps:
+        start = time.perf_counter_ns()
+        result = step(args)
+        record["timings"][phase] = (time.perf_counter_ns() - start) / 1e9
+        if phase == "parse":
+            args = result
+        else:
+            record["answers"][phase] = str(result)
+
+    if memory:
+        record["peak_memory"] = {}
+        tracemalloc.start()
+        try:
+            for phase, step in steps:
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+                result = step(args)
+                record["peak_memory"][phase] = tracemalloc.get_traced_memory()[1] - baseline
+                if phase == "parse":
+                    args = result
+                del result
+        finally:
+            tracemalloc.stop()
+
+    return record
+
+def benchmark_day(year: int, day: int, sizes: Sequence[int], parts: Sequence[int] = (1, 2),
+                  seed: int = 0, memory: bool = True) -> list[dict[str, Any]]:
+    """
+    Benchmark a day over the size sweep, failures are recorded instead of raised.
+    """
+    module = load_day(year, day)
+    records = []
+    for size in sizes:
+        record = {"day": day, "size": size}
+        try:
+            content = module.generate(size, seed)
+            part_kwargs = module.part_kwargs(size) if hasattr(module, "part_kwargs") else None
+            record.update(measure(module, content, parts, memory, part_kwargs))
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+        records.append(record)
+        print(format_record(record), flush=True)
+    return records
+
+def format_record(record: dict[str, Any]) -> str:
+    """ One line summary of a benchmark record """
+    if "error" in record:
+        return f"day {record['day']:>2} size {record['size']:>9}: {record['error']}"
+    phases = ", ".join(
+        f"{phase} {seconds * 1e3:.3f} ms"
+        + (f" / {record['peak_memory'][phase] / 2**20:.2f} MiB" if "peak_memory" in record else "")
+        for phase, seconds in record["timings"].items()
+    )
+    return f"day {record['day']:>2} size {record['size']:>9}: {phases}"
+
+def compare(results: Sequence[dict[str, Any]], baseline: Sequence[dict[str, Any]], threshold: float = 1.25) -> list[str]:
+    """
+    Phases that got slower than `threshold` times their time in the baseline, for the same
+    day and size, or whose answers changed.
+    """
+    previous = {(record["day"], record["size"]): record for record in baseline}
+    regressions = []
+    for record in results:
+        old = previous.get((record["day"], record["size"]))
+        if old is None or "error" in record or "error" in old:
+            continue
+        for phase, seconds in record["timings"].items():
+            before = old["timings"].get(phase)
+            if before and seconds > threshold * before:
+                regressions.append(
+                    f"day {record['day']} size {record['size']} {phase}: "
+                    f"{before * 1e3:.3f} ms -> {seconds * 1e3:.3f} ms ({seconds / before:.2f}x)"
+                )
+        for phase, answer in record["answers"].items():
+            if old["answers"].get(phase, answer) != answer:
+                regressions.append(f"day {record['day']} size {record['size']} {phase}: answer changed")
+    return regressions
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the solutions over synthetic inputs.")
+    parser.add_argument("--year", type=int, default=2026, help="year of the puzzles (default: 2026)")
+    parser.add_argument("--days", type=int, nargs="+", help="days to benchmark (default: all solved days)")
+    parser.add_argument("--parts", type=int, nargs="+", choices=(1, 2), default=[1, 2], help="parts to run")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="input sizes to sweep")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the input generators")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--output", type=pathlib.Path, help="write the results to this JSON file")
+    parser.add_argument("--compare", type=pathlib.Path, help="JSON results of a previous run to compare with")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio reported as regression")
+    return parser.parse_args(argv)
+
+def main(argv: Sequence[str] | None = None) -> None:
+    args = parse_args(argv)
+    days = args.days or list(discover(args.year))
+
+    results = []
+    for day in days:
+        results.extend(benchmark_day(args.year, day, args.sizes, args.parts, args.seed, not args.no_memory))
+
+    if args.output:
+        args.output.write_text(json.dumps({
+            "year": args.year,
+            "seed": args.seed,
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "results": results,
+        }, indent=2))
+
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text())["results"], args.threshold)
+        print("\n".join(regressions) if regressions else f"No regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+"""
+Run the solutions of one or more days and time each phase of the run.
+
+Every day lives in `src/<year>/d<day>/main.py` and provides `parse(content)`, returning a
+tuple of positional arguments, and `part_1` / `part_2` that take as many of those arguments
+as they require. E.g.:
+
+    python -m src.runner --year 2026 --days 1 5 --parts 1 --input test.txt
+
+With `--jobs`, days run concurrently, each in a fresh process (with its own imports and an
+optional memory cap) and results are reported as soon as they finish. Answers are cached by the
+content of the input and of the day's `main.py`, so unchanged days are not solved again (unless
+`--no-cache`). With `--watch`, the days run again whenever their `main.py` or input changes, in
+a long-lived worker process that keeps the modules imported and the inputs parsed. With
+`--importtime`, the
+cold start-up of each day is measured instead, i.e. importing its module in a fresh interpreter.
+"""
+
+import argparse
+import importlib
+import inspect
+import os
+import pathlib
+import re
+import resource
+import subprocess
+import sys
+import time
+
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from types import ModuleType
+from typing import Any, NamedTuple
+
+from src.utils import profiling
+from src.utils.cache import AnswerCache
+
+ROOT = pathlib.Path(__file__).parent
+CACHE_PATH = ROOT / ".cache" / "answers.json"
+PHASES = ("read", "parse", "part 1", "part 2")
+
+# State of the warm worker of the watch mode: the source modification time each day's module
+# was (successfully) loaded from, by (year, day), and the parsed inputs by (year, day, input
+# path) with the source and input modification times they were parsed with
+_LOADED: dict[tuple[int, int], int] = {}
+_PARSED: dict[tuple[int, int, str], tuple[int, int, tuple]] = {}
+
+
+class DayResult(NamedTuple):
+    """ Answers and timings (in seconds, per phase) of running one day """
+    year: int
+    day: int
+    input: str
+    answers: dict[int, Any]
+    timings: dict[str, float]
+    error: str | None = None
+    cpu_time: float = 0.0
+    # Instrumented calls of the day's process, when profiling (see src.utils.profiling)
+    profile: dict[str, profiling.CallStats] | None = None
+    # Parts answered from the answer cache, without being solved
+    cached: tuple[int, ...] = ()
+
+
+def discover(year: int) -> dict[int, pathlib.Path]:
+    """
+    Find the solved days of a year, i.e. `src/<year>/d<day>/main.py`, sorted by day.
+    """
+    days = {}
+    for path in (ROOT / str(year)).glob("d*/main.py"):
+        if match := re.fullmatch(r"d(\d+)", path.parent.name):
+            days[int(match.group(1))] = path
+    return dict(sorted(days.items()))
+
+def load_day(year: int, day: int) -> ModuleType:
+    """ Import the solution module of a day """
+    return importlib.import_module(f"src.{year}.d{day}.main")
+
+def input_path(year: int, day: int, name: str) -> pathlib.Path:
+    """
+    Input file of a day, `name` is either a file name in the day's folder or, if it has a
+    directory part (e.g. "./input.txt"), a path.
+    """
+    if any(sep in name for sep in (os.sep, os.altsep) if sep):
+        return pathlib.Path(name)
+    return ROOT / str(year) / f"d{day}" / name
+
+def call_part(part: Callable, args: tuple) -> Any:
+    """ Call a part with as many of the parsed arguments as it requires """
+    required = [
+        param for param in inspect.signature(part).parameters.values()
+        if param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD) and param.default is param.empty
+    ]
+    return part(*args[:len(required)])
+
+def run_day(year: int, day: int, parts: Sequence[int] = (1, 2), input_name: str = "input.txt",
+            warm: bool = False) -> DayResult:
+    """
+    Read, parse and solve the selected parts of a day, timing each phase with
+    `time.perf_counter_ns`. Failures are reported in the result instead of raised.
+
+    With `warm`, the module is only reloaded if its source changed since the previous warm run
+    in this process, and the input is only parsed again if it (or the module) changed.
+    """
+    path = input_path(year, day, input_name)
+    answers, timings = {}, {}
+    cpu_start = time.process_time()
+
+    def timed(phase: str, function: Callable, *args) -> Any:
+        start = time.perf_counter_ns()
+        try:
+            return function(*args)
+        finally:
+            timings[phase] = (time.perf_counter_ns() - start) / 1e9
+
+    try:
+        if warm:
+            # Times are taken before loading, a change made meanwhile is picked up by the next run
+            source_mtime = (ROOT / str(year) / f"d{day}" / "main.py").stat().st_mtime_ns
+            input_mtime = path.stat().st_mtime_ns
+            imported = f"src.{year}.d{day}.main" in sys.modules
+            module = load_day(year, day)
+            # Reload a module imported from another version of its source, including after a
+            # failed reload (which leaves the previous module in place)
+            if imported and _LOADED.get((year, day)) != source_mtime:
+                module = timed("reload", importlib.reload, module)
+            _LOADED[(year, day)] = source_mtime
+
+            key = (year, day, str(path))
+            state = _PARSED.get(key)
+            if state is not None and state[:2] == (source_mtime, input_mtime):
+                args = state[2]
+            else:
+                content = timed("read", path.read_text, "utf-8")
+                args = timed("parse", module.parse, content)
+                _PARSED[key] = (source_mtime, input_mtime, args)
+        else:
+            module = load_day(year, day)
+            content = timed("read", path.read_text, "utf-8")
+            args = timed("parse", module.parse, content)
+        for part in parts:
+            solve = getattr(module, f"part_{part}", None)
+            if solve is not None:
+                answers[part] = timed(f"part {part}", call_part, solve, args)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        return DayResult(year, day, str(path), answers, timings, error, time.process_time() - cpu_start)
+
+    return DayResult(year, day, str(path), answers, timings, cpu_time=time.process_time() - cpu_start)
+
+def _run_isolated(year: int, day: int, parts: Sequence[int], input_name: str, memory_limit: int | None) -> DayResult:
+    """ Process pool task, run a day in its (fresh) worker process under the memory cap """
+    if memory_limit is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    return run_day(year, day, parts, input_name)._replace(profile=profiling.records())
+
+def _mtimes(year: int, days: Sequence[int], input_name: str) -> dict[int, tuple[int, int]]:
+    """ Modification times of the source and input of each day, 0 when missing """
+    def mtime(path: pathlib.Path) -> int:
+        try:
+            return path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return 0
+    return {
+        day: (mtime(ROOT / str(year) / f"d{day}" / "main.py"), mtime(input_path(year, day, input_name)))
+        for day in days
+    }
+
+def watch(year: int, days: Sequence[int], parts: Sequence[int] = (1, 2), input_name: str = "input.txt",
+          interval: float = 0.5, on_result: Callable[[DayResult, float], None] | None = None) -> None:
+    """
+    Run the days, then run each of them again every time its `main.py` or input changes.
+
+    The days run in a single long-lived worker process, which keeps the imported modules and
+    the parsed inputs, so a rerun only reloads the changed module or parses the changed input
+    (see `run_day` with `warm`). Files are polled every `interval` seconds and `on_result` gets
+    each result with its latency, from noticing the change to the answers. A crashed worker
+    is replaced. Runs until interrupted.
+    """
+    mtimes = _mtimes(year, days, input_name)
+    executor = ProcessPoolExecutor(max_workers=1)
+    try:
+        pending = list(days)
+        while True:
+            for day in pending:
+                start = time.perf_counter()
+                try:
+                    result = executor.submit(run_day, year, day, parts, input_name, True).result()
+                except BrokenProcessPool as e:
+                    # e.g. the solution crashed the interpreter, start over with a fresh worker
+                    executor.shutdown(cancel_futures=True)
+                    executor = ProcessPoolExecutor(max_workers=1)
+                    result = DayResult(year, day, str(input_path(year, day, input_name)), {}, {}, f"{type(e).__name__}: {e}")
+                if on_result is not None:
+                    on_result(result, time.perf_counter() - start)
+
+            pending = []
+            while not pending:
+                time.sleep(interval)
+                current = _mtimes(year, days, input_name)
+                pending = [day for day in days if current[day] != mtimes[day]]
+                mtimes = current
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+def run_days(year: int, days: Sequence[int], parts: Sequence[int] = (1, 2), input_name: str = "input.txt",
+             jobs: int = 1, memory_limit: int | None = None,
+             on_result: Callable[[DayResult], None] | None = None,
+             cache: AnswerCache | None = None) -> list[DayResult]:
+    """
+    Run the days, serially in this process or with `jobs` worker processes.
+
+    Every worker process runs a single day (then is replaced), so days don't share imports or
+    memory, and `memory_limit` (bytes of address space) caps each of them. `on_result` is called
+    for each day as soon as it finishes. Results are returned in the order of `days`.
+
+    With a `cache`, parts already solved for the same input and source are answered from it and
+    only the other parts run. The cache is only read and written in this process.
+    """
+    results, keys, cached = {}, {}, {}
+    pending = {}
+    for day in days:
+        path = input_path(year, day, input_name)
+        cached[day] = {}
+        if cache is not None and path.exists():
+            keys[day] = cache.key(path, ROOT / str(year) / f"d{day}" / "main.py")
+            cached[day] = {part: entry[0] for part in parts if (entry := cache.get(keys[day], part)) is not None}
+        pending[day] = [part for part in parts if part not in cached[day]]
+
+    def finish(day: int, result: DayResult) -> None:
+        if day in keys and result.error is None:
+            for part, answer in result.answers.items():
+                cache.put(keys[day], part, answer, result.timings[f"part {part}"])
+        answers = dict(sorted({**cached[day], **result.answers}.items()))
+        results[day] = result._replace(answers=answers, cached=tuple(cached[day]))
+        if on_result is not None:
+            on_result(results[day])
+
+    # Days with every part cached don't need to run at all
+    for day in days:
+        if not pending[day]:
+            finish(day, DayResult(year, day, str(input_path(year, day, input_name)), {}, {}))
+
+    todo = [day for day in days if pending[day]]
+    if jobs <= 1:
+        for day in todo:
+            finish(day, run_day(year, day, pending[day], input_name))
+    else:
+        def run_pool(days: Sequence[int], workers: int) -> dict[int, BrokenProcessPool]:
+            """ Run the days in a pool, finishing them as they complete, returns the broken ones """
+            broken = {}
+            with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as executor:
+                futures = {
+                    executor.submit(_run_isolated, year, day, pending[day], input_name, memory_limit): day
+                    for day in days
+                }
+                for future in as_completed(futures):
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool as e:
+                        broken[futures[future]] = e
+                        continue
+                    finish(result.day, result)
+            return broken
+
+        # A worker dying (e.g. a crash of the interpreter) breaks the pool and fails every day not
+        # finished yet. Rerun these alone in a fresh pool to find which ones broke it.
+        broken = run_pool(todo, jobs)
+        if len(broken) > 1:
+            broken = {day: e for day in broken for day, e in run_pool([day], 1).items()}
+        for day, e in broken.items():
+            finish(day, DayResult(year, day, str(input_path(year, day, input_name)), {}, {}, f"{type(e).__name__}: {e}"))
+
+    return [results[day] for day in days]
+
+class ImportTime(NamedTuple):
+    """ Cold import time (in seconds) of a day's module and its heaviest imports """
+    day: int
+    total: float
+    heaviest: list[tuple[str, float]]
+
+
+def import_time(year: int, day: int, top: int = 5) -> ImportTime:
+    """
+    Import a day's module in a fresh interpreter with `-X importtime` and parse the report.
+
+    Every line of the report is `import time: self [us] | cumulative [us] | name`, listed after
+    the imports they trigger, which are indented one level deeper. The heaviest imports are the
+    direct imports of the day's module by cumulative time, the interpreter start-up excluded.
+    """
+    module = f"src.{year}.d{day}.main"
+    # `__import__` and not `importlib.import_module`, which isn't timed by `-X importtime`
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"__import__({module!r})"],
+        cwd=ROOT.parent, capture_output=True, text=True, check=True,
+    )
+
+    children: dict[str, float] = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        seconds, depth = int(cumulative) / 1e6, (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:
+            if name.strip() == module:
+                heaviest = sorted(children.items(), key=lambda item: item[1], reverse=True)[:top]
+                return ImportTime(day, seconds, heaviest)
+            children.clear()
+        elif depth == 1:
+            children[name.strip()] = seconds
+
+    raise RuntimeError(f"No import time reported for {module}")
+
+def format_table(results: Sequence[DayResult]) -> str:
+    """ Results as a text table, times in milliseconds """
+    header = ["day", "input", "part 1", "part 2", *(f"{phase} ms" for phase in PHASES), "total ms"]
+    errors = any(result.error for result in results)
+    if errors:
+        header.append("error")
+
+    rows = []
+    for result in results:
+        answers = [
+            f"{result.answers[part]}{' (cached)' if part in result.cached else ''}" if part in result.answers else ""
+            for part in (1, 2)
+        ]
+        times = [f"{result.timings[phase] * 1e3:.3f}" if phase in result.timings else "" for phase in PHASES]
+        total = f"{sum(result.timings.values()) * 1e3:.3f}"
+        rows.append([str(result.day), pathlib.Path(result.input).name, *answers, *times, total])
+        if errors:
+            rows[-1].append(result.error or "")
+
+    widths = [max(len(row[i]) for row in [header, *rows]) for i in range(len(header))]
+    lines = [" | ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in [header, *rows]]
+    lines.insert(1, "-+-".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run and time the puzzle solutions.")
+    parser.add_argument("--year", type=int, default=2026, help="year of the puzzles (default: 2026)")
+    parser.add_argument("--days", type=int, nargs="+", help="days to run (default: all solved days)")
+    parser.add_argument("--parts", type=int, nargs="+", choices=(1, 2), default=[1, 2], help="parts to run")
+    parser.add_argument("--input", default="input.txt", help="input file name in each day's folder, or a path (with a directory part)")
+    parser.add_argument("--jobs", type=int, default=1, help="run this many days concurrently, each in its own process")
+    parser.add_argument("--memory-limit", type=int, help="memory cap in MiB of each day's process (with --jobs)")
+    parser.add_argument("--no-cache", action="store_true", help="solve every part again, ignoring cached answers")
+    parser.add_argument("--watch", action="store_true", help="run the days again whenever their source or input changes")
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between checks for changes (with --watch)")
+    parser.add_argument("--importtime", action="store_true", help="report the cold import time of each day instead")
+    return parser.parse_args(argv)
+
+def main(argv: Sequence[str] | None = None) -> None:
+    args = parse_args(argv)
+    days = args.days or list(discover(args.year))
+
+    if args.importtime:
+        for day in days:
+            report = import_time(args.year, day)
+            heaviest = ", ".join(f"{name} {seconds * 1e3:.1f} ms" for name, seconds in report.heaviest)
+            print(f"day {day:>2} imports in {report.total * 1e3:.1f} ms - {heaviest}", flush=True)
+        return
+
+    if args.watch:
+        def rerun(result: DayResult, latency: float) -> None:
+            status = result.error or ", ".join(f"part {part}: {answer}" for part, answer in result.answers.items())
+            phases = ", ".join(f"{phase} {seconds * 1e3:.3f} ms" for phase, seconds in result.timings.items())
+            print(f"day {result.day} in {latency * 1e3:.1f} ms ({phases}) - {status}", flush=True)
+
+        print(f"Watching days {', '.join(map(str, days))}, Ctrl+C to stop", flush=True)
+        try:
+            watch(args.year, days, args.parts, args.input, args.interval, rerun)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    memory_limit = args.memory_limit * 2**20 if args.memory_limit else None
+
+    def report(result: DayResult) -> None:
+        if args.jobs > 1:
+            status = result.error or ", ".join(f"part {part}: {answer}" for part, answer in result.answers.items())
+            print(f"day {result.day} finished in {sum(result.timings.values()) * 1e3:.3f} ms - {status}", flush=True)
+
+    cache = None if args.no_cache else AnswerCache(CACHE_PATH)
+    start = time.perf_counter()
+    results = run_days(args.year, days, args.parts, args.input, args.jobs, memory_limit, report, cache)
+    wall = time.perf_counter() - start
+    if cache is not None:
+        cache.save()
+
+    print(format_table(results))
+    cpu = sum(result.cpu_time for result in results)
+    print(f"\nWall time {wall:.3f} s, sum of CPU times {cpu:.3f} s ({cpu / wall:.2f}x)")
+
+    if profiling.enabled():
+        # Calls made in this process, plus the ones reported by the worker processes
+        stats = profiling.records()
+        for result in results:
+            stats.update(result.profile or {})
+        print(f"\n{profiling.report(stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,81 @@
 """
 Parsers for the Advent of Code website.
+
+Inputs are fetched lazily, one at a time, by `read_input`, or all the missing inputs of a year
+at once by `prefetch_inputs`, e.g.:
+
+    python -m src.utils.aoc_website --year 2024 --root inputs
 """
 
+import argparse
+import email.utils
 import os
 import pathlib
 
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+
 import dotenv
 import requests
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.utils.cache import write_atomic
+
 dotenv.load_dotenv()
 
+BASE_URL = "https://adventofcode.com"
+INPUT_LAYOUT = "year_{year}/day_{day:02d}/input.data"
+USER_AGENT = f"python-requests/{requests.__version__} (advent of code inputs prefetch)"
+
+
+def _session(pool_size: int = 10, retries: int = 3, backoff: float = 0.5, cookie: str | None = None) -> requests.Session:
+    """
+    Session sharing a pool of `pool_size` connections, retrying rate limited (429) and failed
+    (5xx) requests `retries` times with an exponential backoff (`backoff` * 2^n seconds).
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Cookie": os.environ["AOC_SESSION_COOKIE"] if cookie is None else cookie,
+        "User-Agent": USER_AGENT,
+    })
+    return session
 
-def _get_input(year: int, day: int) -> str:
+
+def _get_input(year: int, day: int, session: requests.Session | None = None, base_url: str = BASE_URL,
+               modified_since: float | None = None) -> str | None:
     """
     Get the input for the given day and year.
+
+    With `modified_since` (a timestamp), the request is conditional and None is returned if
+    the input didn't change since then.
     """
-    return requests.get(
-        f"https://adventofcode.com/{year}/day/{day}/input",
-        headers={"Cookie": os.environ["AOC_SESSION_COOKIE"]},
-        timeout=10,
-    ).text
+    headers = {}
+    if modified_since is not None:
+        headers["If-Modified-Since"] = email.utils.formatdate(modified_since, usegmt=True)
+
+    if session is None:
+        with _session() as session:
+            return _get_input(year, day, session, base_url, modified_since)
+    response = session.get(f"{base_url}/{year}/day/{day}/input", headers=headers, timeout=10)
+    if response.status_code == 304:
+        return None
+    # Don't save the error page of a missing day or an expired cookie as the input
+    response.raise_for_status()
+    return response.text
 
 
 def _parse_year_and_day(path: pathlib.Path) -> tuple[int, int]:
@@ -48,7 +104,80 @@ def read_input(path: pathlib.Path) -> str:
     if not path.exists():
         if path.name == "input.data":
             text = _get_input(*_parse_year_and_day(path))
-            path.write_text(text)
+            write_atomic(path, text)
             return text.strip()
         raise FileNotFoundError(f"File '{path}' not found.")
-    return path.read_text().strip()
+    return path.read_text(encoding="utf-8").strip()
+
+
+def days_of(year: int) -> range:
+    """
+    Puzzle days of a year, 25 until 2024 and 12 since 2025.
+    """
+    return range(1, 26 if year < 2025 else 13)
+
+
+def prefetch_inputs(root: pathlib.Path, year: int, days: Iterable[int] | None = None, layout: str = INPUT_LAYOUT,
+                    workers: int = 8, base_url: str = BASE_URL, refresh: bool = False,
+                    cookie: str | None = None) -> dict[int, str]:
+    """
+    Download the inputs of a year concurrently, over one pooled session.
+
+    Inputs already on disk are skipped, unless `refresh` where they are only downloaded again
+    if the website has a newer version (If-Modified-Since the file's mtime).
+
+    Args:
+        root: folder the `layout` paths are relative to
+        year: year of the puzzles
+        days: days to fetch (default: every day of the year)
+        layout: path of an input, formatted with the year and day
+        workers: number of concurrent downloads (and pooled connections)
+        base_url: website to fetch from, e.g. a local stand-in server
+        refresh: check the inputs already on disk for a newer version
+        cookie: session cookie (default: the AOC_SESSION_COOKIE environment variable)
+
+    Returns: status of each day, "fetched", "cached", "not modified" or the error
+    """
+    days = list(days_of(year) if days is None else days)
+    session = _session(pool_size=workers, cookie=cookie)
+
+    def fetch(day: int) -> str:
+        path = root / layout.format(year=year, day=day)
+        if path.exists() and not refresh:
+            return "cached"
+        modified_since = path.stat().st_mtime if path.exists() else None
+        try:
+            text = _get_input(year, day, session, base_url, modified_since)
+        except requests.RequestException as e:
+            return f"{type(e).__name__}: {e}"
+        if text is None:
+            return "not modified"
+        write_atomic(path, text)
+        return "fetched"
+
+    # The session's connection pool is thread safe, the threads only share it to send requests
+    with session, ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(days, executor.map(fetch, days)))
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Download the missing inputs of a year.")
+    parser.add_argument("--year", type=int, required=True, help="year of the puzzles")
+    parser.add_argument("--days", type=int, nargs="+", help="days to fetch (default: every day of the year)")
+    parser.add_argument("--root", type=pathlib.Path, default=pathlib.Path("."), help="folder to store the inputs in")
+    parser.add_argument("--layout", default=INPUT_LAYOUT, help=f"path of each input (default: {INPUT_LAYOUT})")
+    parser.add_argument("--workers", type=int, default=8, help="number of concurrent downloads")
+    parser.add_argument("--base-url", default=BASE_URL, help=f"website to fetch from (default: {BASE_URL})")
+    parser.add_argument("--refresh", action="store_true", help="download inputs on disk again if they changed")
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    args = parse_args(argv)
+    statuses = prefetch_inputs(args.root, args.year, args.days, args.layout, args.workers, args.base_url, args.refresh)
+    for day, status in statuses.items():
+        print(f"{args.year} day {day:>2}: {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Small persistent caches used to skip work that was already done in a previous run.
+"""
+
+import hashlib
+import json
+import numbers
+import os
+import pathlib
+import stat
+import tempfile
+
+from collections import OrderedDict
+from typing import Any
+
+# Process umask, read once on import as reading it means setting it (not thread safe)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def write_atomic(path: str | pathlib.Path, text: str) -> None:
+    """
+    Write a text file next to the target and rename it, so readers (or a failed write) never
+    leave a half written file behind. The file gets the mode `write_text` would give it, the
+    current one of an existing file or the default one (umask applied) of a new file.
+    """
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        mode = stat.S_IMODE(path.stat().st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        # mkstemp creates the file readable by its owner only
+        os.fchmod(fd, mode)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class LRUFileCache:
+    """
+    A least-recently-used key/value cache persisted as a JSON file.
+
+    Keys are strings and values must be JSON serialisable. The file is loaded once on creation
+    and only written back by `save` (or when leaving a `with` block) if something changed.
+    """
+
+    def __init__(self, path: str | pathlib.Path, maxsize: int = 100_000):
+        self.path = pathlib.Path(path)
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, Any] = OrderedDict()
+        self._dirty = False
+
+        if self.path.exists():
+            try:
+                self._data.update(json.loads(self.path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                # A corrupt or unreadable cache is just an empty cache
+                self._data.clear()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __enter__(self) -> "LRUFileCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.save()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the value stored for ``key`` and mark it as recently used."""
+        if key not in self._data:
+            return default
+        # The recency is part of the cache, save it even if nothing new was stored
+        if next(reversed(self._data)) != key:
+            self._data.move_to_end(key)
+            self._dirty = True
+        return self._data[key]
+
+    def put(self, key: str, value: Any) -> None:
+        """Store ``value`` for ``key``, evicting the least recently used entries if full."""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        self._dirty = True
+
+    def save(self) -> None:
+        """Atomically write the cache to disk if it changed since it was loaded."""
+        if not self._dirty:
+            return
+        write_atomic(self.path, json.dumps(self._data))
+        self._dirty = False
+
+
+def file_digest(path: str | pathlib.Path) -> str:
+    """SHA-256 hex digest of a file's content."""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+class AnswerCache:
+    """
+    Answers of the puzzle parts, addressed by the content of the input and of the solution.
+
+    An entry is keyed by the digests of the input file and of the day's source file, so editing
+    either one misses the cache and the part is solved again. Only the given source file is
+    hashed, changes to shared helpers it imports are not detected.
+    """
+
+    def __init__(self, path: str | pathlib.Path, maxsize: int = 10_000):
+        self._store = LRUFileCache(path, maxsize)
+
+    def __enter__(self) -> "AnswerCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.save()
+
+    @staticmethod
+    def key(input_path: str | pathlib.Path, source_path: str | pathlib.Path) -> str:
+        """Content address of solving ``source_path`` on ``input_path``."""
+        return f"{file_digest(input_path)}:{file_digest(source_path)}"
+
+    def get(self, key: str, part: int) -> tuple[Any, float] | None:
+        """The answer of ``part`` and the seconds it took to solve, if cached."""
+        entry = self._store.get(f"{key}:{part}")
+        return None if entry is None else (entry["answer"], entry["seconds"])
+
+    def put(self, key: str, part: int, answer: Any, seconds: float) -> None:
+        """Store the answer of ``part``, numpy and other integers are stored as ints."""
+        if isinstance(answer, numbers.Integral):
+            answer = int(answer)
+        elif not isinstance(answer, (str, float, type(None))):
+            answer = str(answer)
+        self._store.put(f"{key}:{part}", {"answer": answer, "seconds": seconds})
+
+    def save(self) -> None:
+        """Write the new answers to disk."""
+        self._store.save()
@@ -1,4 +1,22 @@
-from decouple import config
+from functools import cache
 
-SECRET_KEY = config('SECRET_KEY')
-DEBUG_MODE = config('DEBUG_MODE', default=False, cast=bool)
\ No newline at end of file
+# Settings are only resolved (and decouple imported) the first time they are accessed,
+# e.g. SECRET_KEY is not required to run a day that never uses it
+_SETTINGS = {
+    'SECRET_KEY': lambda config: config('SECRET_KEY'),
+    'DEBUG_MODE': lambda config: config('DEBUG_MODE', default=False, cast=bool),
+    'PROFILE': lambda config: config('PROFILE', default=False, cast=bool),
+    'PROFILE_DIR': lambda config: config('PROFILE_DIR', default=''),
+}
+
+
+@cache
+def _resolve(name: str):
+    from decouple import config
+    return _SETTINGS[name](config)
+
+
+def __getattr__(name: str):
+    if name in _SETTINGS:
+        return _resolve(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
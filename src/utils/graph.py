@@ -0,0 +1,86 @@
+"""
+Lightweight graph representations.
+"""
+
+from collections.abc import Iterable
+
+import numpy as np
+
+
+class CSRGraph:
+    """
+    Directed graph stored in compressed sparse row (CSR) form.
+
+    Nodes are numbered 0..n-1 and keep their names in a name <-> id table. The successors of
+    node ``i`` are ``targets[offsets[i]:offsets[i + 1]]``, both arrays being int32, so a graph
+    costs a few bytes per edge instead of the dicts of dicts used by networkx.
+    """
+
+    def __init__(self, names: list[str], offsets: np.ndarray, targets: np.ndarray):
+        if len(offsets) != len(names) + 1:
+            raise ValueError(f"Expected {len(names) + 1} offsets, got {len(offsets)}")
+        self.names = names
+        self.ids = {name: i for i, name in enumerate(names)}
+        self.offsets = offsets
+        self.targets = targets
+
+    @classmethod
+    def from_adjacency(cls, adjacency: Iterable[tuple[str, Iterable[str]]]) -> "CSRGraph":
+        """
+        Build the graph from (node, successors) pairs. Nodes only seen as successors are
+        added without any outgoing edges.
+        """
+        ids: dict[str, int] = {}
+        sources: list[int] = []
+        targets: list[int] = []
+        for node, successors in adjacency:
+            source = ids.setdefault(node, len(ids))
+            for successor in successors:
+                sources.append(source)
+                targets.append(ids.setdefault(successor, len(ids)))
+
+        # Group the edges by source, keeping their order within each source
+        source_ids = np.array(sources, dtype=np.int32)
+        order = np.argsort(source_ids, kind="stable")
+        offsets = np.zeros(len(ids) + 1, dtype=np.int32)
+        np.cumsum(np.bincount(source_ids, minlength=len(ids)), out=offsets[1:])
+
+        return cls(list(ids), offsets, np.array(targets, dtype=np.int32)[order])
+
+    @property
+    def num_edges(self) -> int:
+        """Number of edges in the graph."""
+        return len(self.targets)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.ids
+
+    def __getitem__(self, name: str) -> list[str]:
+        """Names of the successors of the named node."""
+        return [self.names[i] for i in self.successors(self.ids[name])]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(nodes={len(self)}, edges={self.num_edges})"
+
+    def successors(self, node: int) -> np.ndarray:
+        """Ids of the successors of node id ``node``."""
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def adjacency(self) -> list[list[int]]:
+        """Successor ids of every node as plain lists, for tight pure Python loops."""
+        targets = self.targets.tolist()
+        offsets = self.offsets.tolist()
+        return [targets[offsets[i]:offsets[i + 1]] for i in range(len(self))]
+
+    def to_networkx(self):
+        """Convert to a ``networkx.DiGraph`` with the node names, only import networkx here."""
+        import networkx as nx
+
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self.names)
+        for node in range(len(self)):
+            graph.add_edges_from((self.names[node], self.names[i]) for i in self.successors(node))
+        return graph
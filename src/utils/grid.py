@@ -0,0 +1,117 @@
+"""
+Text grids read straight from the bytes of the input.
+"""
+
+import pathlib
+
+from collections.abc import Iterator
+
+import numpy as np
+
+from numpy.lib.stride_tricks import as_strided
+
+NEWLINE = ord("\n")
+
+
+def neighbour_count(mask: np.ndarray, diagonal: bool = True) -> np.ndarray:
+    """
+    Number of set cells around every cell of a 2D mask, cells outside the grid are unset.
+
+    Args:
+        mask: 2D boolean (or 0/1) array
+        diagonal: count the 8 surrounding cells, otherwise only the 4 orthogonal ones
+
+    Returns: uint8 array of the counts, the shape of the mask
+    """
+    height, width = mask.shape
+    padded = np.pad(mask.astype(np.uint8, copy=False), 1)
+    offsets = [(dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1)
+               if (dy or dx) and (diagonal or not (dy and dx))]
+
+    # Sum of the mask shifted towards each neighbour, views of the padded mask so no copies
+    counts = np.zeros((height, width), dtype=np.uint8)
+    for dy, dx in offsets:
+        counts += padded[1 + dy:1 + dy + height, 1 + dx:1 + dx + width]
+    return counts
+
+
+class Grid:
+    """
+    A rectangular text grid as a 2D uint8 array viewing the bytes it was built from.
+
+    The rows of a text file are `width` characters followed by a newline ("\\n" or "\\r\\n"),
+    so the cells are a strided view skipping the newlines rather than a copy. Trailing newlines
+    are ignored, and rows of different widths raise a ValueError.
+    """
+
+    def __init__(self, data: bytes | bytearray | memoryview | str):
+        if isinstance(data, str):
+            data = data.encode()
+        self.buffer = np.frombuffer(data, dtype=np.uint8)
+
+        # Ignore the newlines at the end of the file
+        end = len(self.buffer)
+        while end and int(self.buffer[end - 1]) in b"\r\n":
+            end -= 1
+
+        newlines = np.flatnonzero(self.buffer[:end] == NEWLINE)
+        width = int(newlines[0]) if len(newlines) else end
+        if width and self.buffer[width - 1] == ord("\r"):
+            width -= 1
+        stride = int(newlines[0]) + 1 if len(newlines) else end + 1
+        height = len(newlines) + 1 if end else 0
+
+        # Every row must end at the same offset of the stride, the last one at the end
+        if height and (np.any(newlines != np.arange(len(newlines)) * stride + stride - 1)
+                       or end != (height - 1) * stride + width):
+            raise ValueError("Rows of the grid don't all have the same width")
+
+        self.cells = as_strided(self.buffer, shape=(height, width), strides=(stride, 1), writeable=False)
+
+    @classmethod
+    def from_file(cls, path: str | pathlib.Path) -> "Grid":
+        """ Grid of a text file """
+        return cls(pathlib.Path(path).read_bytes())
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.cells.shape
+
+    @property
+    def height(self) -> int:
+        return self.cells.shape[0]
+
+    @property
+    def width(self) -> int:
+        return self.cells.shape[1]
+
+    def __getitem__(self, index):
+        return self.cells[index]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(height={self.height}, width={self.width})"
+
+    def mask(self, chars: str | bytes) -> np.ndarray:
+        """ Boolean array of the cells holding any of `chars` """
+        if isinstance(chars, str):
+            chars = chars.encode()
+        if len(chars) == 1:
+            return self.cells == chars[0]
+        return np.isin(self.cells, np.frombuffer(chars, dtype=np.uint8))
+
+    def find(self, chars: str | bytes) -> tuple[np.ndarray, np.ndarray]:
+        """ Rows and columns of the cells holding any of `chars`, in row-major order """
+        return np.nonzero(self.mask(chars))
+
+    def neighbour_count(self, chars: str | bytes, diagonal: bool = True) -> np.ndarray:
+        """ Number of neighbouring cells holding any of `chars`, for every cell """
+        return neighbour_count(self.mask(chars), diagonal)
+
+    def rows(self) -> Iterator[bytes]:
+        """ Stream the rows as bytes (without their newline) """
+        for row in self.cells:
+            yield row.tobytes()
+
+    def columns(self) -> Iterator[np.ndarray]:
+        """ Iterate over the columns, top to bottom, as (strided) views """
+        yield from self.cells.T
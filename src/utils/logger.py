@@ -1,13 +1,81 @@
+import atexit
 import logging
-from src.utils.config import DEBUG_MODE
+import os
+import queue
+import threading
+
+from logging.handlers import QueueHandler, QueueListener
+
+from src.utils import config
+
+
+class _LazyQueueHandler(QueueHandler):
+    """ Queue handler starting the listener thread with the first record it queues """
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if _listener is None:
+            _start_listener()
+        super().enqueue(record)
+
+
+# Every logger shares a single queue handler. The caller formats the message when queuing the
+# record (QueueHandler.prepare), the listener's background thread only writes it to stderr. Use
+# lazy %-style arguments, e.g. logger.debug("ranges - %s", ranges), so disabled records cost no
+# formatting at all.
+_handler = _LazyQueueHandler(queue.SimpleQueue())
+_listener: QueueListener | None = None
+_lock = threading.Lock()
+# Forked children stop their listener with the multiprocessing finalizers, see `_after_fork`
+_forked = False
+
+
+def _start_listener() -> None:
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+        # handler = logging.FileHandler(f"{name}.log", mode='w')
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('%(name)s %(asctime)s %(levelname)s %(message)s')
+        handler.setFormatter(formatter)
+        listener = QueueListener(_handler.queue, handler, respect_handler_level=True)
+        listener.start()
+        if _forked:
+            # multiprocessing children leave with os._exit, skipping atexit but running its finalizers
+            from multiprocessing.util import Finalize
+            Finalize(None, _stop_listener, exitpriority=0)
+        _listener = listener
+
+
+def _stop_listener() -> None:
+    """ Flush the queued records and stop the background thread """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def _after_fork() -> None:
+    """
+    The listener is stopped before forking, so processes (e.g. the workers of a process pool)
+    are never forked from a multi-threaded process. A child gets its own queue, and like the
+    parent restarts a listener with its first record.
+    """
+    global _forked, _lock
+    _forked = True
+    _lock = threading.Lock()
+    _handler.queue = queue.SimpleQueue()
+
+
+atexit.register(_stop_listener)
+os.register_at_fork(before=_stop_listener, after_in_child=_after_fork)
 
 
 def get_logger(name):
     logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG if DEBUG_MODE else logging.INFO)
-    # handler = logging.FileHandler(f"{name}.log", mode='w')
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter('%(name)s %(asctime)s %(levelname)s %(message)s')
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG if config.DEBUG_MODE else logging.INFO)
+    # Install the handler once, getting the same logger again must not duplicate its output
+    if _handler not in logger.handlers:
+        logger.addHandler(_handler)
     return logger
@@ -0,0 +1,124 @@
+"""
+Opt-in instrumentation of the solution functions.
+
+Decorate a function with `instrument` to record its call count, wall time, CPU time and peak
+(tracemalloc) memory, and optionally dump a cProfile file per call. Instrumentation is enabled
+by the `DEBUG_MODE` or `PROFILE` settings (e.g. `PROFILE=True python -m src.runner`), when off
+the decorator returns the function untouched so it costs nothing. With `PROFILE_DIR` set, the
+cProfile stats are written there as `<function>.<call>.prof`, e.g. for `python -m pstats`.
+
+Records of all the instrumented functions are kept in this process, see `records` and `report`.
+"""
+
+import cProfile
+import functools
+import pathlib
+import time
+import tracemalloc
+
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+
+from src.utils import config
+
+
+@dataclass
+class CallStats:
+    """ Totals over all the calls of an instrumented function, times in seconds """
+    calls: int = 0
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    peak_memory: int = 0
+
+    def add(self, wall_time: float, cpu_time: float, peak_memory: int) -> None:
+        self.calls += 1
+        self.wall_time += wall_time
+        self.cpu_time += cpu_time
+        self.peak_memory = max(self.peak_memory, peak_memory)
+
+
+_RECORDS: dict[str, CallStats] = {}
+# Peak memory of the instrumented calls in progress, innermost last. tracemalloc only has one
+# peak, so an inner call hands its peak back to the outer one before resetting it.
+_PEAKS: list[int] = []
+_profiling = False
+
+
+def enabled() -> bool:
+    """ Whether functions decorated from now on are instrumented """
+    return bool(config.DEBUG_MODE or config.PROFILE)
+
+def instrument[F: Callable](func: F) -> F:
+    """
+    Record the calls of `func` under its qualified name, when instrumentation is enabled.
+
+    Timings include the tracemalloc overhead, compare them with other instrumented runs only.
+    """
+    if not enabled():
+        return func
+
+    name = f"{func.__module__}.{func.__qualname__}"
+    profile_dir = pathlib.Path(config.PROFILE_DIR) if config.PROFILE_DIR else None
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        global _profiling
+
+        stats = _RECORDS.setdefault(name, CallStats())
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        elif _PEAKS:
+            _PEAKS[-1] = max(_PEAKS[-1], tracemalloc.get_traced_memory()[1])
+        _PEAKS.append(0)
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+
+        # Only one cProfile profiler can be active, nested calls are part of the outer profile
+        profiler = None
+        if profile_dir is not None and not _profiling:
+            profiler, _profiling = cProfile.Profile(), True
+
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            if profiler is not None:
+                return profiler.runcall(func, *args, **kwargs)
+            return func(*args, **kwargs)
+        finally:
+            wall_time, cpu_time = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+            peak = max(_PEAKS.pop(), tracemalloc.get_traced_memory()[1])
+            if _PEAKS:
+                _PEAKS[-1] = max(_PEAKS[-1], peak)
+            if started_tracing:
+                tracemalloc.stop()
+            stats.add(wall_time, cpu_time, peak - baseline)
+
+            if profiler is not None:
+                _profiling = False
+                profile_dir.mkdir(parents=True, exist_ok=True)
+                profiler.dump_stats(profile_dir / f"{name}.{stats.calls}.prof")
+
+    return wrapper
+
+def records() -> dict[str, CallStats]:
+    """ Stats recorded in this process so far, by qualified function name """
+    return dict(_RECORDS)
+
+def reset() -> None:
+    """ Forget the recorded stats """
+    _RECORDS.clear()
+
+def report(stats: Mapping[str, CallStats] | None = None) -> str:
+    """ Stats (by default the ones recorded in this process) as a text table """
+    stats = records() if stats is None else stats
+    header = ["function", "calls", "wall ms", "cpu ms", "peak MiB"]
+    rows = [
+        [name, str(s.calls), f"{s.wall_time * 1e3:.3f}", f"{s.cpu_time * 1e3:.3f}", f"{s.peak_memory / 2**20:.2f}"]
+        for name, s in stats.items()
+    ]
+
+    widths = [max(len(row[i]) for row in [header, *rows]) for i in range(len(header))]
+    lines = [" | ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in [header, *rows]]
+    lines.insert(1, "-+-".join("-" * width for width in widths))
+    return "\n".join(lines)
@@ -0,0 +1,99 @@
+"""
+Hand NumPy arrays to worker processes through shared memory instead of pickling them.
+
+The owner copies its arrays once into `multiprocessing.shared_memory` blocks and sends the
+workers `SharedArray` descriptors, a name, shape and dtype that pickle in a few bytes. Workers
+attach to the blocks and read the arrays in place. E.g.:
+
+    with shared_arrays(dims, counts) as (dims_ref, counts_ref):
+        executor.submit(task, dims_ref, counts_ref, i)
+
+    def task(dims_ref, counts_ref, i):
+        dims, counts = attach(dims_ref), attach(counts_ref)
+        try:
+            ...  # copy what outlives the task out of the views
+        finally:
+            detach(dims_ref, counts_ref)
+
+Attached blocks stay mapped until detached, a long-lived worker must detach them (or keep
+them mapped on purpose, e.g. while more tasks on the same arrays are coming).
+"""
+
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager
+from multiprocessing.shared_memory import SharedMemory
+from typing import NamedTuple
+
+import numpy as np
+
+
+class SharedArray(NamedTuple):
+    """ Descriptor of an array stored in a shared memory block """
+    name: str
+    shape: tuple[int, ...]
+    dtype: str
+
+
+def share(array: np.ndarray) -> tuple[SharedMemory, SharedArray]:
+    """
+    Copy an array into a new shared memory block.
+
+    The caller owns the block and must `close` and `unlink` it, see `shared_arrays`.
+    """
+    array = np.ascontiguousarray(array)
+    # Shared memory blocks can't be empty
+    block = SharedMemory(create=True, size=max(array.nbytes, 1))
+    try:
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    except BaseException:
+        block.close()
+        block.unlink()
+        raise
+    return block, SharedArray(block.name, array.shape, array.dtype.str)
+
+
+@contextmanager
+def shared_arrays(*arrays: np.ndarray) -> Iterator[tuple[SharedArray, ...]]:
+    """
+    Share the arrays for the duration of the block, yielding their descriptors.
+
+    The blocks are unlinked when leaving the block, even on errors. Should this process die
+    first, the resource tracker of multiprocessing (shared with the workers it started)
+    unlinks them when the last of the processes exits.
+    """
+    with ExitStack() as stack:
+        descriptors = []
+        for array in arrays:
+            block, descriptor = share(array)
+            stack.callback(block.unlink)
+            stack.callback(block.close)
+            descriptors.append(descriptor)
+        yield tuple(descriptors)
+
+
+# Blocks attached by this process, by name. They stay mapped (so their views stay valid) until
+# they are detached or the process exits, as closing a block unmaps it under any array viewing it.
+_ATTACHED: dict[str, SharedMemory] = {}
+
+
+def attach(descriptor: SharedArray) -> np.ndarray:
+    """
+    Read-only view of a shared array, each block is only attached once per process.
+    """
+    block = _ATTACHED.get(descriptor.name)
+    if block is None:
+        block = _ATTACHED[descriptor.name] = SharedMemory(name=descriptor.name)
+    array = np.ndarray(descriptor.shape, dtype=np.dtype(descriptor.dtype), buffer=block.buf)
+    array.flags.writeable = False
+    return array
+
+
+def detach(*descriptors: SharedArray) -> None:
+    """
+    Unmap shared arrays from this process, the views returned by `attach` for them must not be
+    used anymore (reading them would crash the process).
+    """
+    for descriptor in descriptors:
+        block = _ATTACHED.pop(descriptor.name, None)
+        if block is not None:
+            block.close()